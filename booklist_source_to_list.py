@@ -1,45 +1,103 @@
 import os
 import re
+import sys
+import json
+import hashlib
 
-class TxtFile:
-    """Custom class for txt files"""
-    def __init__(self, input_filepath):
-        self.object = open(input_filepath, 'r')
-        self.text = self.read_text()
+import lectionary_pdf_to_json as lectionary
 
-    def read_text(self):
-        """Reads the text from the txt file"""
-        return self.object.read()
-
-    def get_text(self):
-        """Gets the text from the txt file"""
-        return self.text
-
-SCRIPT_FOLDERPATH = os.path.dirname(os.path.realpath(__file__))
 BOOKLIST_SOURCE_FILENAME_LIST = ['niv_booklist_source.txt',
 'esv_booklist_source.txt']
 
-NIV_BOOKLIST_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, BOOKLIST_SOURCE_FILENAME_LIST[0])
-NIV_BOOKLIST_SOURCE_TXTFILE = TxtFile(input_filepath=NIV_BOOKLIST_SOURCE_FILEPATH)
-NIV_BOOKLIST_SOURCE_TEXT = NIV_BOOKLIST_SOURCE_TXTFILE.get_text()
-NIV_BOOKLIST = re.findall('"display":"([^"]+)"', NIV_BOOKLIST_SOURCE_TEXT)[::-1]
-
-ESV_BOOKLIST_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, BOOKLIST_SOURCE_FILENAME_LIST[1])
-ESV_BOOKLIST_SOURCE_TXTFILE = TxtFile(input_filepath=ESV_BOOKLIST_SOURCE_FILEPATH)
-ESV_BOOKLIST_SOURCE_TEXT = ESV_BOOKLIST_SOURCE_TXTFILE.get_text()
-ESV_BOOKLIST = re.findall('<h3>([^<]+)</h3>', ESV_BOOKLIST_SOURCE_TEXT)[::-1]
-
-assert(len(NIV_BOOKLIST) == len(ESV_BOOKLIST))
-
-for booklist_index in range(len(NIV_BOOKLIST)):
-    niv_book = NIV_BOOKLIST[booklist_index]
-    esv_book = ESV_BOOKLIST[booklist_index]
-    if niv_book == esv_book:
-        lectionary_no_whitespace_book = niv_book.replace(' ', '')
-    elif [niv_book, esv_book] == ['Psalm', 'Psalms']:
-        lectionary_no_whitespace_book = 'Psalm'
-    elif [niv_book, esv_book] == ['Song of Songs', 'Song of Solomon']:
-        lectionary_no_whitespace_book = 'Song of Solomon'.replace(' ', '')
-    else:
-        print('NIV book: {}, ESV book: {}'.format(niv_book, esv_book))
-    print('|{}|{}|{}|'.format(lectionary_no_whitespace_book, niv_book, esv_book))
+NIV_BOOKLIST_SOURCE_FILEPATH = os.path.join(lectionary.SCRIPT_FOLDERPATH, BOOKLIST_SOURCE_FILENAME_LIST[0])
+ESV_BOOKLIST_SOURCE_FILEPATH = os.path.join(lectionary.SCRIPT_FOLDERPATH, BOOKLIST_SOURCE_FILENAME_LIST[1])
+
+def get_source_checksum():
+    """Gets the SHA-256 hex digest of the names and contents of the source files of the resource bundle"""
+    source_checksum = hashlib.sha256()
+    for source_filename in lectionary.RESOURCE_SOURCE_FILENAME_LIST:
+        with open(os.path.join(lectionary.SCRIPT_FOLDERPATH, source_filename), 'rb') as infile:
+            source_content = infile.read()
+        source_checksum.update(source_filename.encode('utf-8'))
+        source_checksum.update(b'\0')
+        source_checksum.update(source_content)
+        source_checksum.update(b'\0')
+    return source_checksum.hexdigest()
+
+def get_booklist_row_list():
+    """Gets the list of the bookname with no whitespace as written in the lectionary, the bookname in NIV and the bookname in ESV of each book, from the booklists of the NIV and ESV websites"""
+    niv_booklist = re.findall('"display":"([^"]+)"', lectionary.TxtFile(input_filepath=NIV_BOOKLIST_SOURCE_FILEPATH).get_text())[::-1]
+    esv_booklist = re.findall('<h3>([^<]+)</h3>', lectionary.TxtFile(input_filepath=ESV_BOOKLIST_SOURCE_FILEPATH).get_text())[::-1]
+    assert(len(niv_booklist) == len(esv_booklist))
+    output_list = []
+    for niv_book, esv_book in zip(niv_booklist, esv_booklist):
+        if niv_book == esv_book:
+            lectionary_no_whitespace_book = niv_book.replace(' ', '')
+        elif [niv_book, esv_book] == ['Psalm', 'Psalms']:
+            lectionary_no_whitespace_book = 'Psalm'
+        elif [niv_book, esv_book] == ['Song of Songs', 'Song of Solomon']:
+            lectionary_no_whitespace_book = 'Song of Solomon'.replace(' ', '')
+        else:
+            raise ValueError('No lectionary bookname for NIV book: {}, ESV book: {}'.format(niv_book, esv_book))
+        output_list.append((lectionary_no_whitespace_book, niv_book, esv_book))
+    return output_list
+
+def get_resource_bundle_dict(input_source_checksum):
+    """Gets the dictionary of the resource bundle built from its source files"""
+    booklist_row_list = get_booklist_row_list()
+    txt1_source_file = lectionary.TxtFile(input_filepath=lectionary.TXT1_SOURCE_FILEPATH)
+    txt3_source_file = lectionary.TxtFile(input_filepath=lectionary.TXT3_SOURCE_FILEPATH)
+    txt5_source_file = lectionary.TxtFile(input_filepath=lectionary.TXT5_SOURCE_FILEPATH)
+    return {
+        'version': lectionary.RESOURCE_BUNDLE_VERSION,
+        'source_checksum': input_source_checksum,
+        'bookname_no_whitespace_niv_map': {bookname_no_whitespace: bookname_niv for bookname_no_whitespace, bookname_niv, _ in booklist_row_list},
+        'bookname_no_whitespace_esv_map': {bookname_no_whitespace: bookname_esv for bookname_no_whitespace, _, bookname_esv in booklist_row_list},
+        'bible_books': txt1_source_file.get_line_list_no_empty(),
+        'apocryphal_books': [re.search('\|[^|]+\|([^|]+)\|', row).group(1) for row in txt5_source_file.get_line_list_no_empty()],
+        're_patterns': {
+            'bible_book': txt1_source_file.get_bible_book_re_pattern(),
+            'ev_reading_part': txt3_source_file.get_easter_vigil_reading_parts_re_pattern(),
+        },
+    }
+
+def write_resource_bundle(input_filepath, input_resource_bundle_dict):
+    """Writes the resource bundle to a temporary file and renames it to its path"""
+    outfile, temp_filepath = lectionary.open_temp_file(input_filepath)
+    with outfile:
+        json.dump(input_resource_bundle_dict, outfile, indent=1)
+        outfile.write('\n')
+    os.replace(temp_filepath, input_filepath)
+
+def update_resource_bundle(input_filepath=lectionary.RESOURCE_BUNDLE_FILEPATH):
+    """Rebuilds the resource bundle if the checksum of its sources or its version changed, and returns its dictionary"""
+    source_checksum = get_source_checksum()
+    try:
+        with open(input_filepath) as infile:
+            resource_bundle_dict = json.load(infile)
+    except (OSError, ValueError):
+        resource_bundle_dict = {}
+    if [resource_bundle_dict.get('version'), resource_bundle_dict.get('source_checksum')] == [lectionary.RESOURCE_BUNDLE_VERSION, source_checksum]:
+        return resource_bundle_dict
+    resource_bundle_dict = get_resource_bundle_dict(source_checksum)
+    try:
+        write_resource_bundle(input_filepath, resource_bundle_dict)
+    except OSError as os_error:
+        print('Could not save the resource bundle {}, using it from memory: {}'.format(input_filepath, os_error), file=sys.stderr)
+    return resource_bundle_dict
+
+def main(input_arg_list=None):
+    """Command line entry point to generate the resource bundle"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Generate the resource bundle of lectionary_pdf_to_json.py (book maps, book names and regex patterns) from the NIV and ESV booklists and the txt files, if they changed.')
+    parser.add_argument('-o', '--output', default=lectionary.RESOURCE_BUNDLE_FILEPATH, help='path of the resource bundle')
+    parser.add_argument('--rows', action='store_true', help='also print the |no-whitespace|NIV|ESV| row of each book')
+    args = parser.parse_args(input_arg_list)
+    resource_bundle_dict = update_resource_bundle(args.output)
+    if args.rows:
+        for bookname_no_whitespace, bookname_niv in resource_bundle_dict['bookname_no_whitespace_niv_map'].items():
+            print('|{}|{}|{}|'.format(bookname_no_whitespace, bookname_niv, resource_bundle_dict['bookname_no_whitespace_esv_map'][bookname_no_whitespace]))
+    print('Resource bundle {} (source checksum {})'.format(args.output, resource_bundle_dict['source_checksum']), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+import os
+import re
+import timeit
+import tempfile
+
+import lectionary_pdf_to_json as lectionary
+
+BUNDLED_PDF_FILENAME_LIST = ['YearA_2022.pdf', 'YearC_21-22_ALL.pdf']
+
+# the benchmarks keep their page text cache in the temporary folder rather than in the cache of the user
+BENCHMARK_PAGE_TEXT_CACHE_FILEPATH = os.path.join(tempfile.gettempdir(), 'lectionary_benchmark', 'page_text.sqlite3')
+
+def get_page_text_list(input_filepath, input_cache_path=BENCHMARK_PAGE_TEXT_CACHE_FILEPATH):
+    """Gets the list of the text in the pages of a PDF file with their newlines removed, using the page text cache"""
+    return [page_text.replace('\n', ' ') for page_text in lectionary.iter_lectionary_page_texts(input_filepath, cache_path=input_cache_path)]
+
+def get_pdf_text_no_newline(input_filepath, input_cache_path=BENCHMARK_PAGE_TEXT_CACHE_FILEPATH):
+    """Gets the full text of a PDF file with all newlines removed, its pages joined with a space as the converter does"""
+    return ' '.join(get_page_text_list(input_filepath, input_cache_path))
+
+def get_best_time(input_function, input_number, input_repeat=5):
+    """Gets the best time in seconds of one call of the input function"""
+    return min(timeit.repeat(input_function, number=input_number, repeat=input_repeat)) / input_number
+
+def get_flat_trie_re_pattern_dict():
+    """Gets the dictionary mapping the name of each alternation-heavy regex pattern to its flat and its trie version"""
+    txt1_source_file = lectionary.get_txt_file(lectionary.TXT1_SOURCE_FILEPATH)
+    txt3_source_file = lectionary.get_txt_file(lectionary.TXT3_SOURCE_FILEPATH)
+    return {
+        'bible_book': (txt1_source_file.get_bible_book_re_pattern(False), txt1_source_file.get_bible_book_re_pattern()),
+        'ev_reading_part': (txt3_source_file.get_easter_vigil_reading_parts_re_pattern(False), txt3_source_file.get_easter_vigil_reading_parts_re_pattern()),
+        'date_header': (lectionary.get_date_header_re_pattern(False), lectionary.get_date_header_re_pattern()),
+    }
+
+def benchmark_re_patterns(input_text, input_number=3):
+    """Times findall over the input text with the flat and the trie version of each alternation-heavy regex pattern"""
+    output_row_list = []
+    for name, (flat_re_pattern, trie_re_pattern) in get_flat_trie_re_pattern_dict().items():
+        flat_re_compile = re.compile(flat_re_pattern)
+        trie_re_compile = re.compile(trie_re_pattern)
+        assert flat_re_compile.findall(input_text) == trie_re_compile.findall(input_text)
+        flat_time = get_best_time(lambda: flat_re_compile.findall(input_text), input_number)
+        trie_time = get_best_time(lambda: trie_re_compile.findall(input_text), input_number)
+        output_row_list.append((name, flat_time, trie_time))
+    return output_row_list
+
+def benchmark_re_pattern_registry(input_number=10000):
+    """Times building a feast regex pattern and compiling it on every call against getting it from the registry"""
+    per_call_time = get_best_time(lambda: re.compile(lectionary.get_feast_re_pattern()), input_number)
+    lectionary.RE_PATTERN_REGISTRY.get('feast')
+    registry_time = get_best_time(lambda: lectionary.RE_PATTERN_REGISTRY.get('feast'), input_number)
+    return per_call_time, registry_time
+
+import calendar
+import datetime
+import json
+import time
+
+BUNDLED_PDF_FILENAME_TO_START_DATE_DICT = {
+    'YearA_2022.pdf': datetime.date(2022, 11, 24),
+    'YearC_21-22_ALL.pdf': datetime.date(2021, 11, 25),
+}
+PHASE_NAME_LIST = ['extraction', 'typo_correction', 'date_segmentation', 'feast_classification', 'html_rendering', 'json_serialisation']
+
+def get_date_segment_list_list(input_page_str_list, input_start_date):
+    """Gets the list of dates with the list of their segments from the text of the pages with their typos corrected, as segmented by the converter a page at a time"""
+    return list(lectionary.iter_windowed_date_segment_lists(input_page_str_list, input_start_date, {}))
+
+def get_date_header_str(input_date):
+    """Gets a date header as printed in the lectionary, e.g. 'Thu – Nov 24'"""
+    return '{} – {} {}'.format(calendar.day_abbr[input_date.weekday()], calendar.month_abbr[input_date.month], input_date.day)
+
+def remove_date_header_weekdays(input_str):
+    """Returns the input string with the weekday of every date header-like text removed, e.g. 'transferred to Sun. Oct. 30' becomes 'transferred to Oct. 30'"""
+    return lectionary.RE_PATTERN_REGISTRY.get('date_header').sub(lambda date_header_match: date_header_match.group(0)[date_header_match.end(1) - date_header_match.start():], input_str)
+
+def get_synthetic_corpus(input_page_str_list, input_start_date, input_scale):
+    """Gets a text chaining the input number of copies of the dates of a lectionary from the text of its pages with their typos corrected, each copy shifted to start the day after the previous one ends"""
+    # once shifted, a date mentioned in a segment could be taken for the header of the current date or the next one
+    date_segment_list = [(date, remove_date_header_weekdays(segment_str)) for date, segment_list in get_date_segment_list_list(input_page_str_list, input_start_date) for segment_str, _ in segment_list]
+    first_date = date_segment_list[0][0]
+    copy_timedelta = date_segment_list[-1][0] - first_date + datetime.timedelta(days=1)
+    output_str_list = []
+    for copy_index in range(input_scale):
+        for date, segment in date_segment_list:
+            output_str_list.append('{}  {}'.format(get_date_header_str(date + copy_timedelta * copy_index), segment))
+    return '  '.join(output_str_list)
+
+def time_call(input_function):
+    """Calls the input function and returns its result with its wall time in seconds"""
+    start_time = time.perf_counter()
+    result = input_function()
+    return result, time.perf_counter() - start_time
+
+# about the length of the text of a page of the bundled PDF files
+PAGE_LENGTH = 4000
+
+def get_page_str_list(input_str, input_page_length=PAGE_LENGTH):
+    """Gets the list of the pieces of the input text of about the input length, cut at a space, which join back to the text with a space as the pages do"""
+    output_list = []
+    start = 0
+    while True:
+        end = input_str.find(' ', start + input_page_length)
+        if end == -1:
+            output_list.append(input_str[start:])
+            return output_list
+        output_list.append(input_str[start:end])
+        start = end + 1
+
+def time_phases(input_page_str_list, input_start_date, input_error_correction_map):
+    """Times each phase of the converter after the extraction on the input text of the pages, returning the dictionary of phase times and the number of dates"""
+    phase_time_dict = {}
+    # the book names are recovered in the readings as they are parsed, so within the feast classification as in the converter
+    page_str_list, phase_time_dict['typo_correction'] = time_call(lambda: [lectionary.correct_errors(page_str, input_error_correction_map) for page_str in input_page_str_list])
+    date_segment_list_list, phase_time_dict['date_segmentation'] = time_call(lambda: get_date_segment_list_list(page_str_list, input_start_date))
+    date_to_lectionary_item_list_dict, phase_time_dict['feast_classification'] = time_call(lambda: {date: lectionary.get_lectionary_item_list(date, segment_list) for date, segment_list in date_segment_list_list})
+    output_dict, phase_time_dict['html_rendering'] = time_call(lambda: lectionary.get_lectionary_output_dict(date_to_lectionary_item_list_dict))
+    _, phase_time_dict['json_serialisation'] = time_call(lambda: json.dumps(output_dict))
+    return phase_time_dict, len(date_to_lectionary_item_list_dict)
+
+def get_best_phase_time_dict(input_phase_time_dict_list):
+    """Gets the best time of each phase over several runs"""
+    return {phase_name: min(phase_time_dict[phase_name] for phase_time_dict in input_phase_time_dict_list) for phase_name in input_phase_time_dict_list[0].keys()}
+
+def benchmark_phases(input_scale_list=(1, 2, 4, 8), input_repeat=3):
+    """Times each phase of the converter on the bundled PDF files and on synthetic corpora of several times their size, returning the list of results"""
+    lectionary.RE_PATTERN_REGISTRY.compile_all()
+    output_list = []
+    for pdf_filename, start_date in BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.items():
+        pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename)
+        error_correction_map = lectionary.get_error_correction_map(pdf_filepath)
+        extraction_time_list = []
+        for _ in range(input_repeat):
+            def extract():
+                pdf_file = lectionary.PdfFile(input_filepath=pdf_filepath)
+                try:
+                    return [page_text.replace('\n', ' ') for page_text in pdf_file.get_page_text_list()]
+                finally:
+                    pdf_file.close()
+            page_text_list, extraction_time = time_call(extract)
+            extraction_time_list.append(extraction_time)
+        for scale in input_scale_list:
+            page_str_list = page_text_list if scale == 1 else get_page_str_list(get_synthetic_corpus([lectionary.correct_errors(page_text, error_correction_map) for page_text in page_text_list], start_date, scale))
+            phase_time_dict_list = []
+            for _ in range(input_repeat):
+                phase_time_dict, num_dates = time_phases(page_str_list, start_date, error_correction_map)
+                phase_time_dict_list.append(phase_time_dict)
+            phase_time_dict = get_best_phase_time_dict(phase_time_dict_list)
+            if scale == 1:
+                phase_time_dict = dict(extraction=min(extraction_time_list), **phase_time_dict)
+            output_list.append({'corpus': pdf_filename, 'scale': scale, 'num_characters': len(' '.join(page_str_list)), 'num_dates': num_dates, 'phase_times': phase_time_dict})
+    return output_list
+
+def print_phase_results(input_result_list, input_previous_result_list=None):
+    """Prints the phase times of each corpus, with the ratio to the previous results of the same corpus and scale if given"""
+    previous_result_dict = {(result['corpus'], result['scale']): result for result in input_previous_result_list or []}
+    for result in input_result_list:
+        print('{} x{} ({} characters, {} dates)'.format(result['corpus'], result['scale'], result['num_characters'], result['num_dates']))
+        previous_result = previous_result_dict.get((result['corpus'], result['scale']))
+        for phase_name in PHASE_NAME_LIST:
+            if phase_name not in result['phase_times']:
+                continue
+            phase_time = result['phase_times'][phase_name]
+            line = '  {:<22} {:10.2f} ms'.format(phase_name, phase_time * 1000)
+            if previous_result and phase_name in previous_result['phase_times']:
+                line += '  {:6.2f}x previous'.format(phase_time / previous_result['phase_times'][phase_name])
+            print(line)
+
+def get_feast_segment_list():
+    """Gets the list of the feast segments of the bundled PDF files"""
+    output_list = []
+    for pdf_filename, start_date in BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.items():
+        pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename)
+        for date, segment_list in lectionary.iter_lectionary_segments(pdf_filepath, start_date, cache_path=BENCHMARK_PAGE_TEXT_CACHE_FILEPATH):
+            output_list += [segment_str for segment_str, is_feast in segment_list if is_feast]
+    return output_list
+
+def get_adversarial_feast_segment(input_num_repeats):
+    """Gets a feast segment repeating the first three headers without content and missing the last one, on which the feast regex pattern backtracks exponentially"""
+    return 'Feast ' + 'Readings Prayer of the Day Gospel Acclamation ' * input_num_repeats + 'Colo'
+
+def get_feast_diagnostic_dict(input_str):
+    """Gets the diagnostic dictionary of a feast segment that the feast tokenizer cannot cut, None if it can"""
+    try:
+        lectionary.get_feast_section_span_list(input_str)
+    except lectionary.FeastParseError as feast_parse_error:
+        return feast_parse_error.diagnostic_dict
+
+def benchmark_feast_tokenizer(input_adversarial_num_repeats_list=(5, 10, 15, 20), input_number=3):
+    """Checks that the feast tokenizer cuts every feast segment of the bundled PDF files as the feast regex pattern does, and times both on the slowest segment and on adversarial segments"""
+    feast_re_compile = lectionary.RE_PATTERN_REGISTRY.get('feast')
+    feast_segment_list = get_feast_segment_list()
+    worst_segment = None
+    worst_tokenizer_time = 0.0
+    for segment in feast_segment_list:
+        section_span_list = lectionary.get_feast_section_span_list(segment)
+        assert [segment[start:end] for start, end in section_span_list] == list(feast_re_compile.search(segment).groups())
+        tokenizer_time = get_best_time(lambda: lectionary.get_feast_section_span_list(segment), input_number)
+        if tokenizer_time > worst_tokenizer_time:
+            worst_segment, worst_tokenizer_time = segment, tokenizer_time
+    output_row_list = [('worst of {} feasts ({} characters)'.format(len(feast_segment_list), len(worst_segment)), get_best_time(lambda: feast_re_compile.search(worst_segment), input_number), worst_tokenizer_time)]
+    for num_repeats in input_adversarial_num_repeats_list:
+        segment = get_adversarial_feast_segment(num_repeats)
+        assert feast_re_compile.search(segment) is None
+        assert get_feast_diagnostic_dict(segment)['missing_headers'] == ['Color']
+        output_row_list.append(('adversarial ({} characters)'.format(len(segment)), get_best_time(lambda: feast_re_compile.search(segment), 1, 1), get_best_time(lambda: get_feast_diagnostic_dict(segment), input_number)))
+    return output_row_list
+
+def get_reading_key_list():
+    """Gets the list of the book and chapter and verse string of every reading of the bundled PDF files, in order"""
+    output_list = []
+    for pdf_filename, start_date in BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.items():
+        pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename)
+        for date, segment_list in lectionary.iter_lectionary_segments(pdf_filepath, start_date, cache_path=BENCHMARK_PAGE_TEXT_CACHE_FILEPATH):
+            for segment_str, is_feast in segment_list:
+                if is_feast:
+                    raw_readings = lectionary.Feast(segment_str).raw_content_list[1]
+                    if lectionary.get_easter_vigil_part_list(raw_readings) is not None:
+                        continue
+                else:
+                    raw_readings = segment_str
+                book_list, chapter_verse_str_list = lectionary.Readings(raw_readings).get_book_chapter_verse_str_lists()
+                output_list += zip(book_list, chapter_verse_str_list)
+    return output_list
+
+def get_unmemoised_content_html(input_book, input_chapter_verse_str):
+    """Gets the links to a reading for HTML as rendered before the reading references were memoised"""
+    chapter_verse_str_clean = input_chapter_verse_str
+    for pattern, repl in lectionary.CHAPTER_VERSE_STR_PATTERN_REPL_LIST:
+        chapter_verse_str_clean = re.sub(pattern, repl, chapter_verse_str_clean)
+    chapter_verse_str_url = chapter_verse_str_clean
+    for pattern, repl in lectionary.CHAPTER_VERSE_STR_URL_PATTERN_REPL_LIST:
+        chapter_verse_str_url = re.sub(pattern, repl, chapter_verse_str_url)
+    book_no_whitespace = input_book.replace(' ', '')
+    niv_bookname = lectionary.get_bible_bookname_nws_niv_map().get(book_no_whitespace)
+    esv_bookname = lectionary.get_bible_bookname_nws_esv_map().get(book_no_whitespace)
+    if niv_bookname is None:
+        return '<p>This reading is not supported..</p>'
+    niv_url = 'https://www.biblegateway.com/passage/?search={}+{}&version=NIV{}'.format(niv_bookname.replace(' ', '+'), chapter_verse_str_url, '/')
+    esv_url = 'https://www.esv.org/verses/{}+{}/'.format(esv_bookname.replace(' ', '+'), chapter_verse_str_url)
+    return '<p>Text: <a href="{}">New International Version (NIV)</a> . <a href="{}">English Standard Version (ESV)</a></p>'.format(niv_url, esv_url)
+
+def get_memoised_content_html_list(input_reading_key_list):
+    """Gets the links to each reading for HTML through the memoised reading references, starting from empty caches"""
+    lectionary.get_chapter_verse_str_clean_url.cache_clear()
+    lectionary.get_reading_ref.cache_clear()
+    lectionary.get_reading_link_html.cache_clear()
+    return [lectionary.get_reading_ref(book, chapter_verse_str).get_content_html() for book, chapter_verse_str in input_reading_key_list]
+
+def benchmark_reading_refs(input_repeat=5):
+    """Checks that the memoised reading references render the same links as before for every reading of the bundled PDF files, and times a year of readings with and without them, returning the times and the cache statistics"""
+    reading_key_list = get_reading_key_list()
+    unmemoised_content_html_list = [get_unmemoised_content_html(book, chapter_verse_str) for book, chapter_verse_str in reading_key_list]
+    assert get_memoised_content_html_list(reading_key_list) == unmemoised_content_html_list
+    cache_stats_dict = lectionary.get_reading_ref_cache_stats_dict()
+    unmemoised_time = get_best_time(lambda: [get_unmemoised_content_html(book, chapter_verse_str) for book, chapter_verse_str in reading_key_list], 1, input_repeat)
+    memoised_time = get_best_time(lambda: get_memoised_content_html_list(reading_key_list), 1, input_repeat)
+    return len(reading_key_list), unmemoised_time, memoised_time, cache_stats_dict
+
+def get_extracted_page_text_list(input_filepath, input_extractor_name):
+    """Gets the list of the text in the pages of a PDF file extracted with the input extractor, without the page text cache"""
+    pdf_file = lectionary.PdfFile(input_filepath=input_filepath, input_extractor_name=input_extractor_name)
+    try:
+        return pdf_file.get_page_text_list()
+    finally:
+        pdf_file.close()
+
+def get_page_text_list_output_dict(input_page_text_list, input_start_date, input_pdf_filepath):
+    """Gets the dictionary to dump to JSON of the lectionary parsed from the text of its pages"""
+    date_to_lectionary_item_list_dict = {date: lectionary.get_lectionary_item_list(date, segment_list) for date, segment_list in lectionary.iter_windowed_date_segment_lists(input_page_text_list, input_start_date, None, input_pdf_filepath)}
+    return lectionary.get_lectionary_output_dict(date_to_lectionary_item_list_dict)
+
+def get_whitespace_free_record_dict(input_output_dict):
+    """Gets the dictionary mapping the date of each record to its JSON with all whitespace removed, as the extractors differ in where they put whitespace"""
+    return {record['date']: re.sub('\\s+', '', json.dumps(record, ensure_ascii=False)) for record in input_output_dict['main']}
+
+def benchmark_extractors(input_extractor_name_list=None):
+    """Extracts the bundled PDF files with each available extractor, checks the parsed lectionary against the one of the default extractor and times the extraction, returning a row per PDF file and extractor"""
+    extractor_name_list = input_extractor_name_list or lectionary.get_available_pdf_text_extractor_name_list()
+    output_row_list = []
+    for pdf_filename, start_date in BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.items():
+        pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename)
+        reference_output_dict = get_page_text_list_output_dict(get_extracted_page_text_list(pdf_filepath, lectionary.DEFAULT_PDF_TEXT_EXTRACTOR_NAME), start_date, pdf_filepath)
+        reference_record_dict = get_whitespace_free_record_dict(reference_output_dict)
+        for extractor_name in extractor_name_list:
+            page_text_list, extraction_time = time_call(lambda: get_extracted_page_text_list(pdf_filepath, extractor_name))
+            row = {'corpus': pdf_filename, 'extractor': extractor_name, 'num_pages': len(page_text_list), 'pages_per_second': len(page_text_list) / extraction_time}
+            try:
+                output_dict = get_page_text_list_output_dict(page_text_list, start_date, pdf_filepath)
+            except Exception as exception:
+                output_row_list.append(dict(row, identical=False, equivalent=False, error=repr(exception)))
+                continue
+            record_dict = get_whitespace_free_record_dict(output_dict)
+            mismatching_date_str_list = sorted(date_str for date_str in set(reference_record_dict.keys()) | set(record_dict.keys()) if reference_record_dict.get(date_str) != record_dict.get(date_str))
+            output_row_list.append(dict(row, identical=output_dict == reference_output_dict, equivalent=not mismatching_date_str_list, mismatching_dates=mismatching_date_str_list))
+    return output_row_list
+
+def benchmark_parallel_rendering(input_workers_list=(1, 2, 4), input_scale=4):
+    """Checks that the records rendered by each number of worker processes are the same as the ones rendered in this process, and times the rendering of synthetic corpora of the bundled PDF files, returning a row per corpus and number of workers"""
+    output_row_list = []
+    for pdf_filename, start_date in BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.items():
+        pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename)
+        page_text_list = get_page_text_list(pdf_filepath)
+        error_correction_map = lectionary.get_error_correction_map(pdf_filepath, ' '.join(page_text_list))
+        corpus = get_synthetic_corpus([lectionary.correct_errors(page_text, error_correction_map) for page_text in page_text_list], start_date, input_scale)
+        date_segment_list_list = get_date_segment_list_list(get_page_str_list(corpus), start_date)
+        # rendered once before the timing, so that every number of workers finds the caches of this process warm
+        reference_date_record_list = list(lectionary.iter_rendered_lectionary_records(date_segment_list_list))
+        for workers in input_workers_list:
+            date_record_list, render_time = time_call(lambda: list(lectionary.iter_rendered_lectionary_records(date_segment_list_list, input_workers=workers)))
+            assert date_record_list == reference_date_record_list
+            output_row_list.append(('{} x{} ({} dates)'.format(pdf_filename, input_scale, len(date_segment_list_list)), workers, render_time))
+    return output_row_list
+
+def get_compressed_size_dict(input_content):
+    """Gets the dictionary mapping each compression to the size of the input bytes compressed with it, Brotli only if the brotli package is installed"""
+    import gzip
+    output_dict = {'raw': len(input_content), 'gzip': len(gzip.compress(input_content, compresslevel=9, mtime=0))}
+    try:
+        import brotli
+    except ImportError:
+        return output_dict
+    output_dict['brotli'] = len(brotli.compress(input_content, quality=11))
+    return output_dict
+
+def benchmark_precompressed_files(input_temp_folderpath):
+    """Writes the bundled PDF files to JSON files with their precompressed versions, checks that each decompresses to the JSON file and compares their sizes, returning a row per PDF file"""
+    output_row_list = []
+    for pdf_filename, start_date in BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.items():
+        pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename)
+        json_filepath = os.path.join(input_temp_folderpath, 'lectionary.json')
+        lectionary.write_lectionary_json(json_filepath, lectionary.iter_lectionary(pdf_filepath, start_date, cache_path=BENCHMARK_PAGE_TEXT_CACHE_FILEPATH))
+        with open(json_filepath, 'rb') as infile:
+            json_content = infile.read()
+        size_dict = get_compressed_size_dict(json_content)
+        for compressed_filepath in lectionary.write_precompressed_files(json_filepath):
+            with open(compressed_filepath, 'rb') as infile:
+                compressed_content = infile.read()
+            if compressed_filepath.endswith('.gz'):
+                import gzip
+                assert gzip.decompress(compressed_content) == json_content
+                assert len(compressed_content) == size_dict['gzip']
+            else:
+                import brotli
+                assert brotli.decompress(compressed_content) == json_content
+                assert len(compressed_content) == size_dict['brotli']
+        output_row_list.append((pdf_filename, size_dict))
+    return output_row_list
+
+def main(input_arg_list=None):
+    """Command line entry point of the benchmarks"""
+    import argparse
+    import platform
+    parser = argparse.ArgumentParser(description='Benchmarks of the lectionary PDF to JSON converter.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('re-patterns', help='time the flat and the trie regex patterns and the regex pattern registry (default)')
+    subparsers.add_parser('feasts', help='check the feast tokenizer against the feast regex pattern and time both on the slowest and on adversarial feast segments')
+    extractors_parser = subparsers.add_parser('extractors', help='parse the bundled PDF files with each available text extractor, check the lectionary against the default extractor and time the extraction')
+    extractors_parser.add_argument('extractor_name_list', nargs='*', metavar='extractor', help='names of the extractors, all the available ones by default')
+    render_parser = subparsers.add_parser('render', help='check the records rendered in a pool of worker processes against the ones rendered in one process and time both on synthetic corpora')
+    render_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='numbers of worker processes to time')
+    render_parser.add_argument('--scale', type=int, default=4, help='size of the synthetic corpora as a multiple of each PDF file')
+    subparsers.add_parser('precompress', help='check the precompressed versions of the JSON output against it and compare their sizes')
+    subparsers.add_parser('references', help='check the memoised reading references against the links rendered without them and time both on the readings of the bundled PDF files')
+    phases_parser = subparsers.add_parser('phases', help='time each phase on the bundled PDF files and on synthetic corpora of several times their size')
+    phases_parser.add_argument('--scales', type=int, nargs='+', default=[1, 2, 4, 8], help='sizes of the synthetic corpora as multiples of each PDF file')
+    phases_parser.add_argument('--repeat', type=int, default=3, help='number of runs of which the best time is kept')
+    phases_parser.add_argument('-o', '--output', help='path of the JSON file to save the results to')
+    phases_parser.add_argument('--compare', help='path of the JSON file of previous results to compare to')
+    args = parser.parse_args(input_arg_list)
+    if args.command == 'feasts':
+        for name, regex_time, tokenizer_time in benchmark_feast_tokenizer():
+            print('{:<40} regex {:12.3f} ms  tokenizer {:8.3f} ms'.format(name, regex_time * 1000, tokenizer_time * 1000))
+        return
+    if args.command == 'extractors':
+        unavailable_extractor_name_list = [name for name in args.extractor_name_list if name not in lectionary.get_available_pdf_text_extractor_name_list()]
+        if unavailable_extractor_name_list:
+            parser.error('not installed: {}'.format(', '.join(unavailable_extractor_name_list)))
+        for row in benchmark_extractors(args.extractor_name_list):
+            if 'error' in row:
+                parity_str = 'failed: {}'.format(row['error'])
+            elif row['identical']:
+                parity_str = 'identical'
+            elif row['equivalent']:
+                parity_str = 'equivalent up to whitespace'
+            else:
+                parity_str = '{} mismatching dates, first {}'.format(len(row['mismatching_dates']), row['mismatching_dates'][0])
+            print('{:<20} {:<10} {:4} pages {:8.1f} pages/s  {}'.format(row['corpus'], row['extractor'], row['num_pages'], row['pages_per_second'], parity_str))
+        return
+    if args.command == 'render':
+        print('{} CPUs'.format(os.cpu_count()))
+        single_process_time_dict = {}
+        for name, workers, render_time in benchmark_parallel_rendering(args.workers, args.scale):
+            single_process_time = single_process_time_dict.setdefault(name, render_time)
+            print('{:<36} {:2} workers {:10.2f} ms  speedup {:5.2f}x'.format(name, workers, render_time * 1000, single_process_time / render_time))
+        return
+    if args.command == 'precompress':
+        with tempfile.TemporaryDirectory() as temp_folderpath:
+            row_list = benchmark_precompressed_files(temp_folderpath)
+        for pdf_filename, size_dict in row_list:
+            print(pdf_filename)
+            for compression, size in size_dict.items():
+                print('  {:<8} {:8} bytes  {:5.1%}'.format(compression, size, size / size_dict['raw']))
+        return
+    if args.command == 'references':
+        num_readings, unmemoised_time, memoised_time, cache_stats_dict = benchmark_reading_refs()
+        print('{} readings  unmemoised {:8.2f} ms  memoised {:8.2f} ms  speedup {:5.1f}x'.format(num_readings, unmemoised_time * 1000, memoised_time * 1000, unmemoised_time / memoised_time))
+        for name, stats_dict in cache_stats_dict.items():
+            print('  {:<32} {:6} hits {:6} misses  hit rate {:5.1%}'.format(name, stats_dict['hits'], stats_dict['misses'], stats_dict['hit_rate']))
+        return
+    if args.command == 'phases':
+        result_list = benchmark_phases(args.scales, args.repeat)
+        previous_result_list = None
+        if args.compare:
+            with open(args.compare) as infile:
+                previous_result_list = json.load(infile)['results']
+        print_phase_results(result_list, previous_result_list)
+        if args.output:
+            with open(args.output, 'w') as outfile:
+                json.dump({'python': platform.python_version(), 'time': datetime.datetime.now().isoformat(timespec='seconds'), 'results': result_list}, outfile, indent=1)
+        return
+    for pdf_filename in BUNDLED_PDF_FILENAME_LIST:
+        text = get_pdf_text_no_newline(os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename))
+        print('{} ({} characters)'.format(pdf_filename, len(text)))
+        for name, flat_time, trie_time in benchmark_re_patterns(text):
+            print('  {:<16} flat {:8.2f} ms  trie {:8.2f} ms  speedup {:5.1f}x'.format(name, flat_time * 1000, trie_time * 1000, flat_time / trie_time))
+    per_call_time, registry_time = benchmark_re_pattern_registry()
+    print('feast pattern    per call {:8.2f} us  registry {:8.2f} us  speedup {:5.1f}x'.format(per_call_time * 1e6, registry_time * 1e6, per_call_time / registry_time))
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,536 @@
-# PdfFile custom class
-import PyPDF2
-
 # Phase 1: Extract text from PDF file
-class PdfFile:
-    """Custom class for PDF files"""
+# Each extractor wraps a PDF library or tool, imported when a PDF file is opened with it, with the same methods for PdfFile
+class PyPDF2TextExtractor:
+    """Custom class extracting the text of PDF pages with the legacy extractText of PyPDF2"""
     def __init__(self, input_filepath):
+        import PyPDF2
         self.object = open(input_filepath, 'rb')
         self.file_reader = PyPDF2.PdfFileReader(self.object)
+        self.version = 'PyPDF2 {} extractText'.format(PyPDF2.__version__)
+
+    def close(self):
+        """Close the PDF file"""
+        self.object.close()
 
     def get_num_pages(self):
         """Get the number of pages in the PDF file"""
         return self.file_reader.numPages
 
-    def get_page(self, input_page_index):
-        """Get the page object of a page with the specific input page index"""
-        return self.file_reader.getPage(input_page_index)
+    def get_page_text(self, input_page_index):
+        """Get the text in a page with the specific input page index"""
+        return self.file_reader.getPage(input_page_index).extractText()
+
+class PypdfTextExtractor:
+    """Custom class extracting the text of PDF pages with the extract_text of pypdf"""
+    def __init__(self, input_filepath):
+        import pypdf
+        self.object = open(input_filepath, 'rb')
+        self.file_reader = pypdf.PdfReader(self.object)
+        self.version = 'pypdf {} extract_text'.format(pypdf.__version__)
+
+    def close(self):
+        """Close the PDF file"""
+        self.object.close()
+
+    def get_num_pages(self):
+        """Get the number of pages in the PDF file"""
+        return len(self.file_reader.pages)
+
+    def get_page_text(self, input_page_index):
+        """Get the text in a page with the specific input page index"""
+        return self.file_reader.pages[input_page_index].extract_text()
+
+class PdfminerTextExtractor:
+    """Custom class extracting the text of PDF pages with the layout analysis of pdfminer.six, going through the pages in order with a single interpreter"""
+    def __init__(self, input_filepath):
+        import io
+        import pdfminer
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        self.filepath = input_filepath
+        self.object = open(input_filepath, 'rb')
+        self.num_pages = sum(1 for page in PDFPage.get_pages(self.object))
+        # the same text as extract_text of pdfminer.high_level, which parses the document again and goes through the pages before the one asked for on each call
+        self.version = 'pdfminer.six {} extract_text'.format(pdfminer.__version__)
+        self.output = io.StringIO()
+        resource_manager = PDFResourceManager(caching=True)
+        self.device = TextConverter(resource_manager, self.output, laparams=LAParams())
+        self.interpreter = PDFPageInterpreter(resource_manager, self.device)
+        self.page_iter = None
+        self.next_page_index = 0
+
+    def close(self):
+        """Close the PDF file"""
+        self.device.close()
+        self.object.close()
+
+    def get_num_pages(self):
+        """Get the number of pages in the PDF file"""
+        return self.num_pages
+
+    def get_page_text(self, input_page_index):
+        """Get the text in a page with the specific input page index, going on from the last page read, or from the start for an earlier page"""
+        from pdfminer.pdfpage import PDFPage
+        if self.page_iter is None or input_page_index < self.next_page_index:
+            self.page_iter = PDFPage.get_pages(self.object, caching=True)
+            self.next_page_index = 0
+        # the pages in between are only parsed, not interpreted
+        for _ in range(input_page_index - self.next_page_index):
+            next(self.page_iter)
+        page = next(self.page_iter)
+        self.next_page_index = input_page_index + 1
+        self.output.seek(0)
+        self.output.truncate()
+        self.interpreter.process_page(page)
+        return self.output.getvalue()
+
+# pdfinfo gives the number of pages without extracting them, so that a PDF file whose pages are all cached is not run through pdftotext
+POPPLER_PROGRAM_NAME_LIST = ['pdftotext', 'pdfinfo']
+
+def get_is_poppler_installed():
+    """Returns whether all the programs of Poppler used by the pdftotext extractor are installed"""
+    import shutil
+    return all(shutil.which(program_name) is not None for program_name in POPPLER_PROGRAM_NAME_LIST)
+
+class PdftotextTextExtractor:
+    """Custom class extracting the text of PDF pages with the pdftotext program of Poppler, run once over the whole PDF file on the first page"""
+    def __init__(self, input_filepath):
+        import subprocess
+        if not get_is_poppler_installed():
+            raise ImportError('{} of Poppler are not all installed'.format(' and '.join(POPPLER_PROGRAM_NAME_LIST)))
+        self.filepath = input_filepath
+        version_process = subprocess.run(['pdftotext', '-v'], capture_output=True, text=True)
+        self.version = 'pdftotext {}'.format((version_process.stderr or version_process.stdout).split('\n', 1)[0].split()[-1])
+        self.num_pages = None
+        self.page_text_list = None
+
+    def close(self):
+        """Drop the extracted text, pdftotext keeps no file open"""
+        self.page_text_list = None
+
+    def get_num_pages(self):
+        """Get the number of pages in the PDF file, from pdfinfo which comes with pdftotext"""
+        if self.num_pages is None:
+            import subprocess
+            info_process = subprocess.run(['pdfinfo', self.filepath], capture_output=True, text=True, check=True)
+            self.num_pages = int(re.search('^Pages:\\s*([0-9]+)', info_process.stdout, re.MULTILINE).group(1))
+        return self.num_pages
 
     def get_page_text(self, input_page_index):
         """Get the text in a page with the specific input page index"""
-        return self.get_page(input_page_index).extractText()
+        if self.page_text_list is None:
+            import subprocess
+            text_process = subprocess.run(['pdftotext', '-enc', 'UTF-8', self.filepath, '-'], capture_output=True, text=True, encoding='utf-8', check=True)
+            # pdftotext ends every page with a form feed
+            self.page_text_list = text_process.stdout.split('\f')[:-1]
+        return self.page_text_list[input_page_index]
+
+PDF_TEXT_EXTRACTOR_NAME_TO_CLASS_DICT = {
+    'pypdf2': PyPDF2TextExtractor,
+    'pypdf': PypdfTextExtractor,
+    'pdfminer': PdfminerTextExtractor,
+    'pdftotext': PdftotextTextExtractor,
+}
+DEFAULT_PDF_TEXT_EXTRACTOR_NAME = 'pypdf2'
+
+def get_available_pdf_text_extractor_name_list():
+    """Gets the list of the names of the extractors whose library or program is installed"""
+    import importlib.util
+    return [name for name, is_available in [
+        ('pypdf2', importlib.util.find_spec('PyPDF2') is not None),
+        ('pypdf', importlib.util.find_spec('pypdf') is not None),
+        ('pdfminer', importlib.util.find_spec('pdfminer') is not None),
+        ('pdftotext', get_is_poppler_installed()),
+    ] if is_available]
+
+class PdfFile:
+    """Custom class for PDF files"""
+    def __init__(self, input_filepath, input_page_text_cache=None, input_extractor_name=DEFAULT_PDF_TEXT_EXTRACTOR_NAME):
+        self.filepath = input_filepath
+        self.extractor_name = input_extractor_name
+        self.extractor = PDF_TEXT_EXTRACTOR_NAME_TO_CLASS_DICT[input_extractor_name](input_filepath)
+        self.extractor_version = self.extractor.version
+        self.page_text_cache = input_page_text_cache
+        self.content_hash = None
+
+    def close(self):
+        """Close the PDF file"""
+        self.extractor.close()
 
-    def get_page_text_list(self):
+    def get_content_hash(self):
+        """Get the SHA-256 hex digest of the bytes of the PDF file"""
+        if self.content_hash is None:
+            import hashlib
+            content_hash = hashlib.sha256()
+            with open(self.filepath, 'rb') as pdf_file_object:
+                for chunk in iter(lambda: pdf_file_object.read(1 << 20), b''):
+                    content_hash.update(chunk)
+            self.content_hash = content_hash.hexdigest()
+        return self.content_hash
+
+    def get_num_pages(self):
+        """Get the number of pages in the PDF file"""
+        return self.extractor.get_num_pages()
+
+    def get_page_text(self, input_page_index):
+        """Get the text in a page with the specific input page index"""
+        return self.extractor.get_page_text(input_page_index)
+
+    def get_page_range_list(self, input_num_ranges):
+        """Get a list of (start, stop) page index ranges splitting the pages of the PDF file into at most the input number of ranges"""
+        num_pages = self.get_num_pages()
+        range_length = max(1, -(-num_pages // input_num_ranges))
+        return [(start, min(start + range_length, num_pages)) for start in range(0, num_pages, range_length)]
+
+    def iter_page_texts(self, workers=1):
+        """Yield the text in the pages of the PDF file in order, from the page text cache if all pages are cached or else extracting them"""
+        if self.page_text_cache is None:
+            yield from self.iter_extracted_page_texts(workers)
+            return
+        content_hash = self.get_content_hash()
+        if self.page_text_cache.get_num_pages(content_hash, self.extractor_version) == self.get_num_pages():
+            if PROFILER is not None:
+                PROFILER.count('page_text_cache_hit', self.get_num_pages())
+            yield from self.page_text_cache.iter_page_texts(content_hash, self.extractor_version)
+            return
+        if PROFILER is not None:
+            PROFILER.count('page_text_cache_miss', self.get_num_pages())
+        # the pages are stored a few at a time in short transactions, so that neither the whole PDF file is kept in memory nor a write transaction stays open during the extraction and blocks the other processes sharing the cache
+        page_text_list = []
+        start_page_index = 0
+        for page_text in self.iter_extracted_page_texts(workers):
+            yield page_text
+            page_text_list.append(page_text)
+            if len(page_text_list) == PAGE_TEXT_CACHE_BATCH_SIZE:
+                self.page_text_cache.add_page_text_list(content_hash, self.extractor_version, start_page_index, page_text_list)
+                start_page_index += len(page_text_list)
+                page_text_list = []
+        if page_text_list:
+            self.page_text_cache.add_page_text_list(content_hash, self.extractor_version, start_page_index, page_text_list)
+
+    def iter_extracted_page_texts(self, workers=1):
+        """Yield the text in the pages of the PDF file in order, extracting page ranges in a pool of the input number of worker processes"""
+        if workers <= 1:
+            for page_index in range(self.get_num_pages()):
+                yield self.get_page_text(page_index)
+            return
+        import concurrent.futures
+        # several ranges per worker so that the first pages are yielded while the later ones are still extracted
+        page_range_list = self.get_page_range_list(workers * 4)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            filepath_list = [self.filepath] * len(page_range_list)
+            extractor_name_list = [self.extractor_name] * len(page_range_list)
+            for page_text_list in executor.map(get_page_range_text_list, filepath_list, page_range_list, extractor_name_list):
+                yield from page_text_list
+
+    def get_page_text_list(self, workers=1):
         """Get a list of the text in the pages of the PDF file"""
-        return [self.get_page_text(page_index) for page_index in range(self.get_num_pages())]
+        return list(self.iter_page_texts(workers))
 
-    def get_full_text(self):
-        """Get the full text of the PDF file"""
-        return ' '.join(self.get_page_text_list())
+def get_page_range_text_list(input_filepath, input_page_range, input_extractor_name=DEFAULT_PDF_TEXT_EXTRACTOR_NAME):
+    """Custom function for a worker process to get the list of the text in a range of pages, using its own reader of the PDF file"""
+    pdf_file = PdfFile(input_filepath=input_filepath, input_extractor_name=input_extractor_name)
+    try:
+        return [pdf_file.get_page_text(page_index) for page_index in range(*input_page_range)]
+    finally:
+        pdf_file.close()
 
-    def get_full_text_no_newline(self):
-        """Get the full text of the PDF file with all newlines removed"""
-        return self.get_full_text().replace('\n', ' ')
+PAGE_TEXT_CACHE_TIMEOUT_SECONDS = 60
+# pages stored per transaction, a PDF file only counting as cached once all its pages are stored
+PAGE_TEXT_CACHE_BATCH_SIZE = 16
+
+class PageTextCache:
+    """Custom class for the SQLite file caching the text of PDF pages by PDF content hash, page index and extractor version"""
+    def __init__(self, input_filepath):
+        import sqlite3
+        folderpath = os.path.dirname(input_filepath)
+        if folderpath:
+            os.makedirs(folderpath, exist_ok=True)
+        # several processes of a batch share the file: wait for the lock of another writer rather than fail, and let readers go on while one writes
+        self.connection = sqlite3.connect(input_filepath, timeout=PAGE_TEXT_CACHE_TIMEOUT_SECONDS)
+        deadline = time.monotonic() + PAGE_TEXT_CACHE_TIMEOUT_SECONDS
+        while True:
+            try:
+                self.connection.execute('PRAGMA journal_mode=WAL')
+                break
+            except sqlite3.OperationalError:
+                # switching a new file to WAL fails at once, without waiting, while another process is creating it
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS page_text (content_hash TEXT, page_index INTEGER, extractor_version TEXT, text TEXT, PRIMARY KEY (content_hash, page_index, extractor_version))')
+
+    def close(self):
+        """Close the SQLite file"""
+        self.connection.close()
+
+    def get_num_pages(self, input_content_hash, input_extractor_version):
+        """Get the number of cached pages of a PDF file"""
+        cursor = self.connection.execute('SELECT COUNT(*) FROM page_text WHERE content_hash = ? AND extractor_version = ?', (input_content_hash, input_extractor_version))
+        return cursor.fetchone()[0]
+
+    def iter_page_texts(self, input_content_hash, input_extractor_version):
+        """Yield the text in the cached pages of a PDF file in order, one page at a time"""
+        cursor = self.connection.execute('SELECT text FROM page_text WHERE content_hash = ? AND extractor_version = ? ORDER BY page_index', (input_content_hash, input_extractor_version))
+        for (page_text,) in cursor:
+            yield page_text
+
+    def add_page_text_list(self, input_content_hash, input_extractor_version, input_start_page_index, input_page_text_list):
+        """Store the list of the text in consecutive pages of a PDF file from the input page index in one short transaction"""
+        row_list = [(input_content_hash, page_index, input_extractor_version, page_text) for page_index, page_text in enumerate(input_page_text_list, input_start_page_index)]
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO page_text VALUES (?, ?, ?, ?)', row_list)
 
 import os
+import functools
 SCRIPT_FOLDERPATH = os.path.dirname(os.path.realpath(__file__))
 
-PDF_SOURCE_FILENAME = 'YearA_2022.pdf' # 'YearC_21-22_ALL.pdf'
-PDF_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, PDF_SOURCE_FILENAME)
-PDF_SOURCE_FILE = PdfFile(input_filepath=PDF_SOURCE_FILEPATH)
-PDF_SOURCE_FILE_TEXT_NO_NEWLINE = PDF_SOURCE_FILE.get_full_text_no_newline()
+# The typos of each source and the settings of the book name recovery are in a config file, read on first use
+# fix typos in the sources listed by filename - disabled for the other sources since it seems that currently they contain a lot of typos with dates mismatching
+# the same sources are also listed by the title on their first page, for copies of the PDF files saved under another name
+ERROR_CORRECTION_CONFIG_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, 'error_correction_config.json')
+
+@functools.lru_cache(maxsize=None)
+def get_error_correction_config(input_filepath=ERROR_CORRECTION_CONFIG_FILEPATH):
+    """Gets the dictionary of the error correction config file"""
+    import json
+    with open(input_filepath) as infile:
+        return json.load(infile)
+
+def get_pdf_source_filename_to_error_correction_map_dict():
+    """Gets the dictionary mapping the filename of a source to its map of typos to their corrections"""
+    return get_error_correction_config()['filenames']
+
+def get_pdf_source_title_to_error_correction_map_dict():
+    """Gets the dictionary mapping the title of a source to its map of typos to their corrections"""
+    return get_error_correction_config()['titles']
+
+def get_error_correction_map(input_filepath, input_str=None):
+    """Gets the map of typos to their corrections for the PDF file with the input filepath, by its filename or else by the title at the start of its text"""
+    filename = os.path.basename(input_filepath)
+    if filename in get_pdf_source_filename_to_error_correction_map_dict():
+        return get_pdf_source_filename_to_error_correction_map_dict()[filename]
+    if input_str is not None:
+        return get_pdf_source_title_to_error_correction_map_dict().get(get_lectionary_source_title(input_str), {})
+    return {}
+
+def correct_errors(input_str, input_error_correction_map):
+    """Returns the input string with every typo in the input error correction map corrected"""
+    output_str = input_str
+    for error in input_error_correction_map.keys():
+        correction = input_error_correction_map[error]
+        output_str = output_str.replace(error, correction)
+    return output_str
+
+# Opt-in profiling of the conversion: every hook is skipped while PROFILER is None
+import time
+import heapq
+
+class Profiler:
+    """Custom class recording the wall time and call count of each phase, the segment length and time of each date, the slowest calls of some methods and cache counters"""
+    # methods wrapped with a timer only while the profiler is installed, with the attribute giving the label of a call
+    PROFILED_METHOD_LIST = [('Feast', 'get_section_span_list', 'input_str'), ('Readings', '__init__', None)]
+
+    def __init__(self, input_top_n=10):
+        self.top_n = input_top_n
+        self.phase_to_time_count_dict = {}
+        self.date_to_metrics_dict = {}
+        self.call_name_to_slowest_heap_dict = {}
+        self.counter_dict = {}
+        self.original_method_list = []
+
+    def add_phase_time(self, input_phase_name, input_seconds):
+        """Adds a call of the input duration to the phase"""
+        time_count = self.phase_to_time_count_dict.setdefault(input_phase_name, [0.0, 0])
+        time_count[0] += input_seconds
+        time_count[1] += 1
+
+    def add_date_time(self, input_date, input_metric_name, input_seconds, input_segment_length=0):
+        """Adds the input duration to a metric of a date, along with the length of one of its segments"""
+        metrics_dict = self.date_to_metrics_dict.setdefault(input_date, {'segment_length': 0, 'num_segments': 0, 'parse_time': 0.0, 'render_time': 0.0})
+        metrics_dict[input_metric_name] += input_seconds
+        if input_segment_length:
+            metrics_dict['segment_length'] += input_segment_length
+            metrics_dict['num_segments'] += 1
+
+    def add_call_time(self, input_call_name, input_seconds, input_label):
+        """Keeps the call among the slowest calls of its name"""
+        slowest_heap = self.call_name_to_slowest_heap_dict.setdefault(input_call_name, [])
+        item = (input_seconds, len(slowest_heap), input_label)
+        if len(slowest_heap) < self.top_n:
+            heapq.heappush(slowest_heap, item)
+        elif input_seconds > slowest_heap[0][0]:
+            heapq.heapreplace(slowest_heap, item)
+
+    def count(self, input_counter_name, input_increment=1):
+        """Increments a counter"""
+        self.counter_dict[input_counter_name] = self.counter_dict.get(input_counter_name, 0) + input_increment
+
+    def install(self):
+        """Makes this profiler the active one and wraps the profiled methods with a timer"""
+        global PROFILER
+        PROFILER = self
+        for class_name, method_name, label_attribute_name in self.PROFILED_METHOD_LIST:
+            input_class = globals()[class_name]
+            method = input_class.__dict__[method_name]
+            self.original_method_list.append((input_class, method_name, method))
+            setattr(input_class, method_name, self.get_timed_method(method, '{}.{}'.format(class_name, method_name), label_attribute_name))
+
+    def uninstall(self):
+        """Restores the profiled methods and deactivates profiling"""
+        global PROFILER
+        for input_class, method_name, method in self.original_method_list:
+            setattr(input_class, method_name, method)
+        self.original_method_list = []
+        PROFILER = None
+
+    def get_timed_method(self, input_method, input_call_name, input_label_attribute_name):
+        """Returns the method wrapped to record the duration of its calls"""
+        profiler = self
+        @functools.wraps(input_method)
+        def timed_method(self, *args, **kwargs):
+            start_time = time.perf_counter()
+            output = input_method(self, *args, **kwargs)
+            label = getattr(self, input_label_attribute_name) if input_label_attribute_name else args[0] if args else ''
+            profiler.add_call_time(input_call_name, time.perf_counter() - start_time, label[:80])
+            return output
+        return timed_method
+
+    def get_slowest_date_list(self):
+        """Gets the list of the slowest dates with their metrics"""
+        return heapq.nlargest(self.top_n, self.date_to_metrics_dict.items(), key=lambda date_metrics: date_metrics[1]['parse_time'] + date_metrics[1]['render_time'])
+
+    def get_report(self):
+        """Gets the dictionary of all recorded metrics, ready to dump to JSON"""
+        lru_cache_dict = {}
+        for function in [convert_month_abbr_name_to_month, get_resource_bundle, get_chapter_verse_str_clean_url, get_reading_ref, get_reading_link_html]:
+            lru_cache_dict[function.__name__] = get_lru_cache_stats_dict(function)
+        return {
+            'phases': {phase_name: {'time': time_count[0], 'count': time_count[1]} for phase_name, time_count in self.phase_to_time_count_dict.items()},
+            'dates': [dict(date=date.isoformat(), **metrics_dict) for date, metrics_dict in sorted(self.date_to_metrics_dict.items())],
+            'slowest_dates': [dict(date=date.isoformat(), **metrics_dict) for date, metrics_dict in self.get_slowest_date_list()],
+            'slowest_calls': {call_name: [{'time': seconds, 'label': label} for seconds, _, label in sorted(slowest_heap, reverse=True)] for call_name, slowest_heap in self.call_name_to_slowest_heap_dict.items()},
+            'counters': self.counter_dict,
+            'lru_caches': lru_cache_dict,
+        }
+
+    def get_summary(self):
+        """Gets the text summary of the phases and the slowest dates"""
+        output_line_list = ['Phases:']
+        for phase_name, (seconds, count) in self.phase_to_time_count_dict.items():
+            output_line_list.append('  {:<22} {:10.2f} ms  {:6} calls'.format(phase_name, seconds * 1000, count))
+        output_line_list.append('Slowest dates:')
+        for date, metrics_dict in self.get_slowest_date_list():
+            output_line_list.append('  {}  parse {:8.2f} ms  render {:8.2f} ms  {:6} characters in {} segment(s)'.format(date, metrics_dict['parse_time'] * 1000, metrics_dict['render_time'] * 1000, metrics_dict['segment_length'], metrics_dict['num_segments']))
+        for counter_name, counter in self.counter_dict.items():
+            output_line_list.append('{}: {}'.format(counter_name, counter))
+        return '\n'.join(output_line_list)
 
-if PDF_SOURCE_FILENAME in ['YearA_ALL_22-23.pdf', 'YearA_2022.pdf']:
-    # fix typos in this source - disabled since it seems that currently this lectionary contains a lot of typos with dates mismatching
-    ERROR_CORRECTION_MAP = {'Febrews': 'Hebrews'}
-    for error in ERROR_CORRECTION_MAP.keys():
-        correction = ERROR_CORRECTION_MAP[error]
-        PDF_SOURCE_FILE_TEXT_NO_NEWLINE = PDF_SOURCE_FILE_TEXT_NO_NEWLINE.replace(error, correction)
+PROFILER = None
+
+# Regex patterns are registered by name and compiled once on first use
+import re
+import sys
+import itertools
+
+class RePatternRegistry:
+    """Custom class for a registry of regex patterns, each built and compiled once on first use"""
+    def __init__(self):
+        self.name_to_builder_flags_dict = {}
+        self.name_to_re_compile_dict = {}
+
+    def register(self, input_name, input_builder, input_flags=0):
+        """Registers the function building the regex pattern with the input name"""
+        self.name_to_builder_flags_dict[input_name] = (input_builder, input_flags)
+        self.name_to_re_compile_dict.pop(input_name, None)
+
+    def get(self, input_name):
+        """Gets the compiled regex pattern with the input name, building and compiling it on first use"""
+        if input_name not in self.name_to_re_compile_dict:
+            builder, flags = self.name_to_builder_flags_dict[input_name]
+            self.name_to_re_compile_dict[input_name] = re.compile(builder(), flags)
+        return self.name_to_re_compile_dict[input_name]
+
+    def compile_all(self):
+        """Builds and compiles every registered regex pattern, e.g. to warm up a long running process"""
+        for name in self.name_to_builder_flags_dict.keys():
+            self.get(name)
+
+RE_PATTERN_REGISTRY = RePatternRegistry()
+
+WHITESPACE_SEPARATOR_TOKEN_LIST = ['\s', '\s*']
+
+def get_whitespace_token_list(input_str, input_word_separator='\s'):
+    """Splits the input string into the list of its characters with the regex pattern tolerating stray whitespace between them and the input separator between its words"""
+    token_list = []
+    for word_index, word in enumerate(input_str.split()):
+        if word_index:
+            token_list.append(input_word_separator)
+        for char_index, char in enumerate(word):
+            if char_index:
+                token_list.append('\s*')
+            token_list.append(char)
+    return token_list
+
+def get_trie_node_re_pattern(input_node):
+    """Returns the regex pattern of a node of a prefix trie of token lists"""
+    alternative_list = [token + get_trie_node_re_pattern(child_node) if token is not None else '' for token, child_node in input_node]
+    if len(alternative_list) == 1:
+        return alternative_list[0]
+    return '(?:{})'.format('|'.join(alternative_list))
+
+def get_alternation_re_pattern(input_token_list_list, input_use_trie=True):
+    """Returns the regex pattern matching the same text as the ordered alternation of the input token lists, factored into a prefix trie unless told otherwise"""
+    if not input_use_trie:
+        return '|'.join(''.join(token_list) for token_list in input_token_list_list)
+    root_node = []
+    for token_list in input_token_list_list:
+        node = root_node
+        for token in token_list + [None]:
+            child_node_list = [child_node for child_token, child_node in node if child_token == token]
+            if token is None:
+                # a repeated alternative can never match before its first occurrence
+                if not child_node_list:
+                    node.append((None, None))
+                break
+            # literal characters cannot match at the same position, so merging them keeps the order of the alternation,
+            # while a separator may only be merged into the last branch
+            if child_node_list and (token not in WHITESPACE_SEPARATOR_TOKEN_LIST or node[-1][0] == token):
+                node = child_node_list[-1]
+            else:
+                child_node = []
+                node.append((token, child_node))
+                node = child_node
+    return get_trie_node_re_pattern(root_node)
 
 # Phase 2: Extract date and date contents from PDF file text
 import datetime
 import calendar
 
-def get_month_abbr_name_re_pattern_group(input_month):
-    """Returns the regex pattern of a group searches for either the month_abbr or month_name attribute of a particular input month"""
-    month_abbr = calendar.month_abbr[input_month]
-    month_name = calendar.month_name[input_month]
-    month_abbr_whitespace = '\s*'.join(month_abbr)
-    month_name_whitespace = '\s*'.join(month_name)
-    month_abbr_name_whitespace_list = [month_abbr_whitespace, month_name_whitespace]
-    return '({})'.format('|'.join(month_abbr_name_whitespace_list))
-
-def get_day_re_pattern_group(input_day):
-    """Returns the regex pattern for an particular input day"""
-    input_day = str(input_day)
-    return '({})'.format('\s*'.join(input_day))
-
-def convert_date_to_re_pattern(input_date):
-    """Convert a given date to the date's respective regex pattern"""
-    month = input_date.month
-    day = input_date.day
-    calendar_day_abbr_whitespace_list = ['\s*'.join(day_abbr) for day_abbr in calendar.day_abbr] + ['\s*'.join(day_name) for day_name in calendar.day_name]
-    calendar_day_abbr_re_pattern_group = '({})'.format('|'.join(calendar_day_abbr_whitespace_list))
-    month_abbr_name_re_pattern_group = get_month_abbr_name_re_pattern_group(month)
-    day_re_pattern_group = get_day_re_pattern_group(day)
-    date_re_pattern_group_list = [calendar_day_abbr_re_pattern_group, month_abbr_name_re_pattern_group, day_re_pattern_group]
-    return '\W*'.join(date_re_pattern_group_list)
+def get_day_abbr_name_re_pattern_group(input_use_trie=True):
+    """Returns the regex pattern of a group searches for the day_abbr or day_name attribute of any day of the week"""
+    calendar_day_abbr_token_list_list = [get_whitespace_token_list(day_abbr_name) for day_abbr_name in list(calendar.day_abbr) + list(calendar.day_name)]
+    return '({})'.format(get_alternation_re_pattern(calendar_day_abbr_token_list_list, input_use_trie))
 
-def convert_date_list_to_re_pattern(input_list):
-    """Convert a list of dates to the dates' respective regex pattern"""
-    date_re_pattern_list = []
-    for date in input_list:
-        date_re_pattern = convert_date_to_re_pattern(date)
-        date_re_pattern_list.append(date_re_pattern)
-    return '({})'.format('|'.join(date_re_pattern_list))
+def get_month_abbr_name_re_pattern_group(input_month=None, input_use_trie=True):
+    """Returns the regex pattern of a group searches for either the month_abbr or month_name attribute of a particular input month, or of any month if no input month is given"""
+    if input_month:
+        month_abbr_list = [calendar.month_abbr[input_month]]
+        month_name_list = [calendar.month_name[input_month]]
+    else:
+        month_abbr_list = list(calendar.month_abbr)[1:]
+        month_name_list = list(calendar.month_name)[1:]
+    month_abbr_name_token_list_list = [get_whitespace_token_list(month_abbr_name) for month_abbr_name in month_abbr_list + month_name_list]
+    return '({})'.format(get_alternation_re_pattern(month_abbr_name_token_list_list, input_use_trie))
 
+def get_date_header_re_pattern(input_use_trie=True):
+    """Returns the regex pattern matching the date header of any date, with the month and the day digits as the last two groups"""
+    date_re_pattern_group_list = [get_day_abbr_name_re_pattern_group(input_use_trie), get_month_abbr_name_re_pattern_group(input_use_trie=input_use_trie), '([0-9](?:\s*[0-9])?)']
+    return '\W*'.join(date_re_pattern_group_list)
+
+@functools.lru_cache(maxsize=None)
 def convert_month_abbr_name_to_month(input_str):
     """Convert a month_abbr/month_name to the month number"""
     month_abbr_name_list = list(calendar.month_abbr) + list(calendar.month_name)
@@ -106,19 +553,6 @@ def convert_date_str_to_date(input_str, input_in_memory_date):
         output_year = input_in_memory_date.year
     return datetime.date(output_year, output_month, output_day)
 
-import re
-
-def process_phase_2a(input_date, input_str):
-    """Custom function to run phase 2a of the PDF scrapping"""
-    date_list = [input_date, input_date + datetime.timedelta(days=1)]
-    date_list_re_pattern = convert_date_list_to_re_pattern(date_list)
-    date_list_re_search = re.search(date_list_re_pattern, input_str)
-    if date_list_re_search:
-        output_date_str = date_list_re_search.group(0)
-        output_date = convert_date_str_to_date(output_date_str, input_date)
-        output_content = input_str[date_list_re_search.end():].strip()
-        return output_date_str, output_date, output_content
-
 def replace_chars(input_str, input_dict):
     """Custom function to replace all char in an input string in the input dictionary's keys with the corresponding value in the dictionary"""
     output_str = input_str
@@ -134,160 +568,537 @@ def push_to_dict(input_dict, input_key, input_val):
     else:
         input_dict[input_key] = [input_val]
 
-def process_phase_2b(input_dict, input_date_str, input_in_memory_date, input_in_memory_content):
-    """Custom function to run phase 2b of the PDF scrapping"""
-    value = input_in_memory_content.split(input_date_str)[0]
-    lectionary_year_re_pattern = replace_chars('\W*'.join('(YearA'), {'(': '[(]?', 'A': '[ABC]'})
-    value = re.split(lectionary_year_re_pattern, value, flags=re.I)[0].strip()
-    push_to_dict(input_dict, input_in_memory_date, LectionaryItem(value))
+def get_lectionary_year_re_pattern():
+    """Returns the regex pattern matching a lectionary year header"""
+    return replace_chars('\W*'.join('(YearA'), {'(': '[(]?', 'A': '[ABC]'})
+
+# Whitespace layer: the text with all whitespace removed, with an offset map back to the original text
+from array import array
+import bisect
+
+class WhitespaceCollapsedText:
+    """Custom class for a text with all whitespace removed and the map from its indices to the indices in the original text"""
+    def __init__(self, input_str):
+        self.original_text = input_str
+        non_whitespace_run_list = []
+        self.original_index_array = array('I')
+        for non_whitespace_match in re.finditer('\S+', input_str):
+            non_whitespace_run_list.append(non_whitespace_match.group())
+            self.original_index_array.extend(range(non_whitespace_match.start(), non_whitespace_match.end()))
+        self.text = ''.join(non_whitespace_run_list)
+
+    def get_original_start(self, input_collapsed_index):
+        """Gets the index in the original text of the character at the input index of the collapsed text"""
+        return self.original_index_array[input_collapsed_index]
+
+    def get_original_end(self, input_collapsed_end):
+        """Gets the end index in the original text of a span ending before the input index of the collapsed text"""
+        return self.original_index_array[input_collapsed_end - 1] + 1
+
+    def get_collapsed_index(self, input_original_index):
+        """Gets the index in the collapsed text of the first non-whitespace character at or after the input index of the original text"""
+        return bisect.bisect_left(self.original_index_array, input_original_index)
+
+def get_collapsed_re_pattern(input_re_pattern):
+    """Returns the regex pattern with the stray whitespace tolerance removed, for use on a whitespace collapsed text"""
+    return input_re_pattern.replace('\s*', '')
+
+def get_start_date_re_pattern():
+    """Returns the regex pattern matching a date with its year, e.g. 'Nov. 24, 2022', with groups for the month, the day and the year"""
+    return '\W*'.join([get_month_abbr_name_re_pattern_group(), '([0-9]{1,2})', '([0-9]{4})'])
+
+def get_lectionary_source_title_re_pattern():
+    """Returns the regex pattern matching the title of a lectionary source, e.g. 'Year A 2022/2023', with groups for the lectionary year and the two calendar years"""
+    return 'Year([ABC])([0-9]{4})/([0-9]{4})'
+
+# the title and the date range of the first season are at the start of the first page
+START_PAGE_COLLAPSED_LENGTH = 2000
+
+def infer_start_date(input_str):
+    """Infers the date of the first date header of a lectionary from the first date with a year at the start of its text"""
+    collapsed_text = WhitespaceCollapsedText(input_str[:START_PAGE_COLLAPSED_LENGTH * 2]).text[:START_PAGE_COLLAPSED_LENGTH]
+    start_date_re_search = RE_PATTERN_REGISTRY.get('collapsed_start_date').search(collapsed_text)
+    if not start_date_re_search:
+        raise ValueError('Could not infer the start date of the lectionary, please give it explicitly')
+    month = convert_month_abbr_name_to_month(start_date_re_search.group(1))
+    return datetime.date(int(start_date_re_search.group(3)), month, int(start_date_re_search.group(2)))
+
+def get_lectionary_source_title(input_str):
+    """Gets the title at the start of the text of a lectionary, e.g. 'Year A 2022/2023', or None if there is none"""
+    collapsed_text = WhitespaceCollapsedText(input_str[:START_PAGE_COLLAPSED_LENGTH * 2]).text[:START_PAGE_COLLAPSED_LENGTH]
+    title_re_search = RE_PATTERN_REGISTRY.get('lectionary_source_title').search(collapsed_text)
+    if title_re_search:
+        return 'Year {} {}/{}'.format(*title_re_search.groups())
+
+RE_PATTERN_REGISTRY.register('date_header', get_date_header_re_pattern)
+RE_PATTERN_REGISTRY.register('collapsed_date_header', lambda: get_collapsed_re_pattern(get_date_header_re_pattern()))
+RE_PATTERN_REGISTRY.register('collapsed_start_date', lambda: get_collapsed_re_pattern(get_start_date_re_pattern()))
+RE_PATTERN_REGISTRY.register('lectionary_source_title', get_lectionary_source_title_re_pattern)
+RE_PATTERN_REGISTRY.register('lectionary_year', get_lectionary_year_re_pattern, re.I)
+
+def get_date_header_match_date_end(input_match, input_in_memory_date):
+    """Returns the date and the end index of a date header match if it is the header of the in-memory date or the day after, otherwise None"""
+    month = convert_month_abbr_name_to_month(remove_char(input_match.group(2), ' '))
+    day_digit_str = remove_char(input_match.group(3), ' ')
+    for date in [input_in_memory_date, input_in_memory_date + datetime.timedelta(days=1)]:
+        day_str = str(date.day)
+        if date.month == month and day_digit_str.startswith(day_str):
+            # a one digit day also matches the first digit of the header digits, e.g. 'Dec 1 2 Kings'
+            end = input_match.start(3) + 1 if len(day_str) < len(day_digit_str) else input_match.end()
+            return convert_date_str_to_date(input_match.string[input_match.start():end], input_in_memory_date), end
+
+def get_date_segment_span(input_collapsed_text, input_start, input_end):
+    """Custom function to get the span in the original text of the content of a date, stripped and cut before any lectionary year header"""
+    collapsed_start = input_collapsed_text.get_collapsed_index(input_start)
+    collapsed_end = input_collapsed_text.get_collapsed_index(input_end)
+    if input_end < len(input_collapsed_text.original_text):
+        lectionary_year_re_search = RE_PATTERN_REGISTRY.get('lectionary_year').search(input_collapsed_text.text, collapsed_start, collapsed_end)
+        if lectionary_year_re_search:
+            collapsed_end = lectionary_year_re_search.start()
+    if collapsed_start >= collapsed_end:
+        return input_start, input_start
+    return input_collapsed_text.get_original_start(collapsed_start), input_collapsed_text.get_original_end(collapsed_end)
+
+def get_lectionary_item_list(input_date, input_segment_list):
+    """Custom function to run phase 3 and 4 of the PDF scrapping on the segments of a date, logging and leaving out each feast that cannot be parsed"""
+    profiler = PROFILER
+    lectionary_item_list = []
+    for segment_str, is_feast in input_segment_list:
+        if profiler is not None:
+            parse_start_time = time.perf_counter()
+        try:
+            lectionary_item = LectionaryItem(segment_str, input_is_feast=is_feast)
+        except FeastParseError as feast_parse_error:
+            # the other items of the date and the other dates are still converted
+            LOGGER.error('Skipped a feast on %s: %s', get_date_str(input_date), feast_parse_error)
+            if profiler is not None:
+                profiler.count('feast_parse_errors')
+            continue
+        lectionary_item_list.append(lectionary_item)
+        if profiler is None:
+            continue
+        parse_time = time.perf_counter() - parse_start_time
+        profiler.add_phase_time('feast_classification', parse_time)
+        profiler.add_date_time(input_date, 'parse_time', parse_time, len(segment_str))
+    return lectionary_item_list
+
+# Windowed segmentation: the text is added a page at a time and only the text from the content of the current date is kept
+# a date header match this close to the end of the window could still grow, e.g. by its second day digit, so it waits for more text
+DATE_HEADER_COLLAPSED_MARGIN = 64
+
+class WindowedDateSegmenter:
+    """Custom class segmenting the text of a lectionary added a window at a time into the content of each date, scanning the added text once for date headers"""
+    def __init__(self, input_start_date):
+        self.window_str = ''
+        # index in the window where the scan for date headers resumes
+        self.scan_start = 0
+        self.in_memory_date = input_start_date
+        # index in the window of the content of the in-memory date, None before its header
+        self.in_memory_start = None
 
-def process_phase_2_to_4(input_str):
-    """Custom function to run phase 2, 3 and 4 of the PDF scrapping"""
-    date = datetime.date(2022, 11, 24)
+    def add_text(self, input_str):
+        """Adds text to the window, returning the list of the date, content string and whether it is a feast of each segment completed by a date header"""
+        self.window_str += input_str
+        return self.get_segment_list(False)
+
+    def finish(self):
+        """Returns the list of the segments left once all the text is added, the last one ending at the end of the text"""
+        return self.get_segment_list(True)
+
+    def get_segment(self, input_collapsed_text, input_start, input_end):
+        """Gets the date, content string and whether it is a feast of the segment of the in-memory date in the input span of the window"""
+        start, end = get_date_segment_span(input_collapsed_text, input_start, input_end)
+        is_feast = get_is_feast_span(input_collapsed_text, input_collapsed_text.get_collapsed_index(start), input_collapsed_text.get_collapsed_index(end))
+        return self.in_memory_date, self.window_str[start:end], is_feast
+
+    def get_segment_list(self, input_is_final):
+        """Scans the window for date headers from where the previous scan stopped and gets the completed segments, then drops the text before the content of the in-memory date"""
+        segment_list = []
+        collapsed_text = WhitespaceCollapsedText(self.window_str)
+        safe_end = len(collapsed_text.text) if input_is_final else len(collapsed_text.text) - DATE_HEADER_COLLAPSED_MARGIN
+        for date_header_match in RE_PATTERN_REGISTRY.get('collapsed_date_header').finditer(collapsed_text.text, collapsed_text.get_collapsed_index(self.scan_start)):
+            if date_header_match.end() > safe_end:
+                break
+            date_end = get_date_header_match_date_end(date_header_match, self.in_memory_date)
+            if date_end:
+                if self.in_memory_start is not None:
+                    segment_list.append(self.get_segment(collapsed_text, self.in_memory_start, collapsed_text.get_original_start(date_header_match.start())))
+                self.in_memory_date, collapsed_end = date_end
+                self.in_memory_start = collapsed_text.get_original_end(collapsed_end)
+            self.scan_start = collapsed_text.get_original_end(date_header_match.end())
+        if input_is_final:
+            if self.in_memory_start is not None:
+                segment_list.append(self.get_segment(collapsed_text, self.in_memory_start, len(self.window_str)))
+            self.window_str = ''
+            return segment_list
+        window_start = self.scan_start if self.in_memory_start is None else self.in_memory_start
+        self.window_str = self.window_str[window_start:]
+        self.scan_start -= window_start
+        if self.in_memory_start is not None:
+            self.in_memory_start -= window_start
+        return segment_list
+
+def iter_corrected_page_texts(input_page_text_iter, input_error_correction_map=None, input_pdf_path=''):
+    """Custom generator to yield the text of each page with its newlines removed and its typos corrected, preceded by the start of the corrected text, which is long enough to infer the start date"""
+    profiler = PROFILER
+    page_text_iter = iter(input_page_text_iter)
+    # the title and the start date are at the start of the text, so the first pages are kept until it is long enough to find them
+    if profiler is not None:
+        extraction_start_time = time.perf_counter()
+    head_page_text_list = []
+    head_length = 0
+    for page_text in page_text_iter:
+        head_page_text_list.append(page_text.replace('\n', ' '))
+        head_length += len(page_text) + 1
+        if head_length > START_PAGE_COLLAPSED_LENGTH * 2:
+            break
+    if profiler is not None:
+        typo_correction_start_time = time.perf_counter()
+        profiler.add_phase_time('extraction', typo_correction_start_time - extraction_start_time)
+    error_correction_map = input_error_correction_map
+    if error_correction_map is None:
+        error_correction_map = get_error_correction_map(input_pdf_path, ' '.join(head_page_text_list))
+    # a typo without whitespace never runs across pages since they are joined with a space
+    head_page_text_list = [correct_errors(page_text, error_correction_map) for page_text in head_page_text_list]
+    if profiler is not None:
+        profiler.add_phase_time('typo_correction', time.perf_counter() - typo_correction_start_time)
+    yield ' '.join(head_page_text_list)
+    yield from head_page_text_list
+    while True:
+        if profiler is not None:
+            extraction_start_time = time.perf_counter()
+        page_text = next(page_text_iter, None)
+        if page_text is None:
+            return
+        if profiler is not None:
+            typo_correction_start_time = time.perf_counter()
+            profiler.add_phase_time('extraction', typo_correction_start_time - extraction_start_time)
+        page_text = correct_errors(page_text.replace('\n', ' '), error_correction_map)
+        if profiler is not None:
+            profiler.add_phase_time('typo_correction', time.perf_counter() - typo_correction_start_time)
+        yield page_text
+
+def iter_windowed_date_segment_lists(input_page_text_iter, input_start_date=None, input_error_correction_map=None, input_pdf_path=''):
+    """Custom generator to run phase 2 of the PDF scrapping over a stream of page texts, yielding each date with the list of its segments, each the content string and whether it is a feast, as soon as the header of the next date is found, in memory bounded by a page and the content of a date"""
+    profiler = PROFILER
+    corrected_page_text_iter = iter_corrected_page_texts(input_page_text_iter, input_error_correction_map, input_pdf_path)
+    head_str = next(corrected_page_text_iter)
+    date_segmenter = WindowedDateSegmenter(input_start_date if input_start_date is not None else infer_start_date(head_str))
+    del head_str
     in_memory_date = None
-    in_memory_content = None
-    output_dict = {}
-    while process_phase_2a(date, input_str):
-        date_str, date, content = process_phase_2a(date, input_str)
-        if in_memory_date:
-            process_phase_2b(output_dict, date_str, in_memory_date, input_str)
-        in_memory_date = date
-        input_str = content
-    push_to_dict(output_dict, date, LectionaryItem(content))
-    return output_dict
+    in_memory_segment_list = []
+    for page_index, page_text in enumerate(itertools.chain(corrected_page_text_iter, [None])):
+        if profiler is not None:
+            segmentation_start_time = time.perf_counter()
+        if page_text is None:
+            segment_list = date_segmenter.finish()
+        else:
+            segment_list = date_segmenter.add_text(page_text if page_index == 0 else ' ' + page_text)
+        if profiler is not None:
+            profiler.add_phase_time('date_segmentation', time.perf_counter() - segmentation_start_time)
+        for date, segment_str, is_feast in segment_list:
+            # the dates of the segments never decrease, so the segments of a date are consecutive
+            if date != in_memory_date and in_memory_segment_list:
+                yield in_memory_date, in_memory_segment_list
+                in_memory_segment_list = []
+            in_memory_date = date
+            in_memory_segment_list.append((segment_str, is_feast))
+    if in_memory_segment_list:
+        yield in_memory_date, in_memory_segment_list
 
 # Phase 3: Classify date contents into feasts and daily readings
 # Phase 4: Separate the feast name, readings, prayer, acclamation and color(s)
+FEAST_HEADER_LIST = ['Readings', 'PrayeroftheDay', 'GospelAcclamation', 'Color']
+
+def get_feast_header_re_pattern():
+    """Returns the regex pattern for any header of a feast, with whitespace allowed between its letters and a group for each header"""
+    # the lookahead on the first letters skips most positions without trying each header
+    first_letter_str = ''.join(header[0] for header in FEAST_HEADER_LIST)
+    return '(?=[{}])(?:{})'.format(first_letter_str, '|'.join(['({})'.format('\s*'.join(header)) for header in FEAST_HEADER_LIST]))
+
+def get_feast_re_pattern():
+    """Returns the regex pattern with a group for the feast name and for the content after each header of a feast, as cut by get_feast_section_span_list in linear time"""
+    header_whitespace_list = ['\s*'.join(header) for header in FEAST_HEADER_LIST]
+    section_re_list = ['{}\W*(\w.+\S)'.format(header) for header in header_whitespace_list]
+    return '([A-Z].+\S)\s*{}'.format('\s*'.join(section_re_list))
+
+def get_read_respond_re_pattern():
+    """Returns the regex pattern for the reading and response headers in a reading part for the Vigil of Easter"""
+    return '|'.join(['[A-Za-z\s]+' + '\s*'.join('Reading:'), '\s*'.join('Response:')])
+
+def get_is_feast_span(input_collapsed_text, input_start, input_end):
+    """Returns whether the headers of a feast appear in order in the input span of the whitespace collapsed text, with at least one character of the original text between them"""
+    previous_end = input_start
+    previous_original_end = None
+    for header in FEAST_HEADER_LIST:
+        position = input_collapsed_text.text.find(header, previous_end, input_end)
+        while position != -1 and previous_original_end is not None and input_collapsed_text.get_original_start(position) == previous_original_end:
+            position = input_collapsed_text.text.find(header, position + 1, input_end)
+        if position == -1:
+            return False
+        previous_end = position + len(header)
+        previous_original_end = input_collapsed_text.get_original_end(previous_end)
+    return True
+
+class FeastParseError(ValueError):
+    """Custom exception for a feast whose headers are missing, out of order or not followed by content, with the diagnostic dictionary of its headers"""
+    def __init__(self, input_diagnostic_dict):
+        self.diagnostic_dict = input_diagnostic_dict
+        super().__init__('Cannot parse the feast {!r}: {}'.format(input_diagnostic_dict['text'], {key: value for key, value in input_diagnostic_dict.items() if key != 'text'}))
+
+def get_feast_header_span_list_list(input_str):
+    """Gets the list of the spans of the occurrences of each feast header in a single scan, the headers never overlapping each other"""
+    header_span_list_list = [[] for _ in FEAST_HEADER_LIST]
+    for feast_header_re_match in RE_PATTERN_REGISTRY.get('feast_header').finditer(input_str):
+        header_span_list_list[feast_header_re_match.lastindex - 1].append(feast_header_re_match.span())
+    return header_span_list_list
+
+def get_is_feast_str(input_str):
+    """Returns whether the headers of a feast appear in order in the input string, with at least one character between them"""
+    previous_end = -1
+    for header_span_list in get_feast_header_span_list_list(input_str):
+        header_start_list = [header_start for header_start, _ in header_span_list if header_start > previous_end]
+        if not header_start_list:
+            return False
+        previous_end = next(header_end for header_start, header_end in header_span_list if header_start == header_start_list[0])
+    return True
+
+def get_section_content_span(input_str, input_start, input_end, input_first_char_re_compile):
+    """Gets the span of the content of a section from its first character matching the input regex to its last non-whitespace character, None if it has less than 3 characters"""
+    first_char_re_search = input_first_char_re_compile.search(input_str, input_start, input_end)
+    if first_char_re_search is None:
+        return None
+    content_start = first_char_re_search.start()
+    content_end = input_end
+    while content_end > content_start and input_str[content_end - 1].isspace():
+        content_end -= 1
+    if content_end - content_start < 3:
+        return None
+    return content_start, content_end
+
+def get_feast_diagnostic_dict(input_str, input_header_span_list_list, input_empty_section):
+    """Gets the diagnostic dictionary of a feast that cannot be cut into sections"""
+    missing_header_list = [header for header, header_span_list in zip(FEAST_HEADER_LIST, input_header_span_list_list) if not header_span_list]
+    out_of_order_header_list = []
+    previous_end = 0
+    for header, header_span_list in zip(FEAST_HEADER_LIST, input_header_span_list_list):
+        if header in missing_header_list:
+            continue
+        next_header_span_list = [header_span for header_span in header_span_list if header_span[0] >= previous_end]
+        if next_header_span_list:
+            previous_end = next_header_span_list[0][1]
+        else:
+            out_of_order_header_list.append(header)
+    return {
+        'text': input_str[:80],
+        'header_positions': {header: [header_span[0] for header_span in header_span_list] for header, header_span_list in zip(FEAST_HEADER_LIST, input_header_span_list_list)},
+        'missing_headers': missing_header_list,
+        'out_of_order_headers': out_of_order_header_list,
+        'empty_section': None if missing_header_list or out_of_order_header_list else input_empty_section,
+    }
+
+def get_feast_section_span_list(input_str):
+    """Custom function to cut the content of a feast on one line into the spans of the feast name and of the content after each header, as the feast regex pattern would but in linear time, raising FeastParseError with a diagnostic if it cannot"""
+    header_span_list_list = get_feast_header_span_list_list(input_str)
+    word_char_re_compile = RE_PATTERN_REGISTRY.get('word_char')
+    # the greedy groups of the regex pattern take the last occurrence of each header still followed by content, so scan from the last header
+    section_span_list = []
+    section_end = len(input_str)
+    for header, header_span_list in zip(reversed(FEAST_HEADER_LIST), reversed(header_span_list_list)):
+        for header_start, header_end in reversed(header_span_list):
+            content_span = get_section_content_span(input_str, header_end, section_end, word_char_re_compile) if header_end <= section_end else None
+            if content_span is not None:
+                section_span_list.append(content_span)
+                section_end = header_start
+                break
+        else:
+            raise FeastParseError(get_feast_diagnostic_dict(input_str, header_span_list_list, header))
+    name_span = get_section_content_span(input_str, 0, section_end, RE_PATTERN_REGISTRY.get('upper_char'))
+    if name_span is None:
+        raise FeastParseError(get_feast_diagnostic_dict(input_str, header_span_list_list, 'Feast name'))
+    section_span_list.append(name_span)
+    return section_span_list[::-1]
+
+RE_PATTERN_REGISTRY.register('feast', get_feast_re_pattern)
+RE_PATTERN_REGISTRY.register('feast_header', get_feast_header_re_pattern)
+RE_PATTERN_REGISTRY.register('word_char', lambda: '\w')
+RE_PATTERN_REGISTRY.register('upper_char', lambda: '[A-Z]')
+RE_PATTERN_REGISTRY.register('read_respond', get_read_respond_re_pattern)
+RE_PATTERN_REGISTRY.register('or_split', lambda: '\s+[Oo][Rr]\s+(?=[A-Z])')
+RE_PATTERN_REGISTRY.register('or_split_keep_or', lambda: '\s+([Oo][Rr])\s+(?=[A-Z])')
+
 class LectionaryItem:
     """Custom class for a lectionary item"""
-    def __init__(self, input_str):
+    __slots__ = ('input_str', 'is_feast', 'feast', 'readings')
+
+    def __init__(self, input_str, input_is_feast=None):
         self.input_str = input_str
-        self.is_feast = self.get_is_feast()
-        if self.is_feast:
-            self.feast = Feast(input_str)
+        self.is_feast = self.get_is_feast() if input_is_feast is None else input_is_feast
+        self.feast = Feast(input_str) if self.is_feast else None
+        self.readings = None if self.is_feast else Readings(input_str)
 
     def get_is_feast(self):
-        """Returns the regex match object for the lectionary item being a feast"""
-        feast_header_list = ['Readings', 'PrayeroftheDay', 'GospelAcclamation', 'Color']
-        feast_header_whitespace_list = ['\s*'.join(header) for header in feast_header_list]
-        feast_re_pattern = '.+'.join(feast_header_whitespace_list)
-        return bool(re.search(feast_re_pattern, self.input_str))
+        """Returns whether the lectionary item is a feast"""
+        return get_is_feast_str(self.input_str)
 
     def get_html(self):
         """Returns a the string representing the lectionary item when it's printed for HTML"""
         if self.is_feast:
             output_str = self.feast.get_html()
         else:
-            output_str = '<h2>Daily Lectionary</h2>' + Readings(self.input_str).get_html()
+            output_str = '<h2>Daily Lectionary</h2>' + self.readings.get_html()
         return output_str
 
+    def get_json_dict(self):
+        """Returns the dictionary representing the structure of the lectionary item in JSON"""
+        if self.is_feast:
+            return dict(type='feast', **self.feast.get_json_dict())
+        return {'type': 'daily', 'readings': self.readings.get_json_list()}
+
     def __str__(self):
         """Returns a the string representing the lectionary item when it's printed"""
         if self.is_feast:
             output_str = str(self.feast)
         else:
-            output_str = str(Readings(self.input_str))
+            output_str = str(self.readings)
         return output_str
 
+class ReadingSection:
+    """Custom class for the readings under a reading or response header of a reading part for the Vigil of Easter"""
+    __slots__ = ('header', 'readings')
+
+    def __init__(self, input_header, input_str):
+        self.header = input_header.strip()
+        self.readings = Readings(input_str)
+
+    def get_html(self):
+        """Returns the string representing the reading section when it's printed for HTML"""
+        return '<h5>{}</h5> {}'.format(self.header, self.readings.get_html())
+
+    def get_json_dict(self):
+        """Returns the dictionary representing the reading section in JSON"""
+        return {'header': self.header, 'readings': self.readings.get_json_list()}
+
+    def __str__(self):
+        """Returns the string representing the reading section when it's printed"""
+        return '{} {}'.format(self.header, self.readings)
+
+class EasterVigilPart:
+    """Custom class for a reading part for the Vigil of Easter, with either reading sections or readings"""
+    __slots__ = ('header', 'reading_section_list', 'readings')
+
+    def __init__(self, input_header, input_str):
+        self.header = input_header.strip()
+        read_respond_re_compile = RE_PATTERN_REGISTRY.get('read_respond')
+        if read_respond_re_compile.search(input_str):
+            read_respond_header_list = read_respond_re_compile.findall(input_str)
+            read_respond_content_list = read_respond_re_compile.split(input_str)[1:]
+            self.reading_section_list = [ReadingSection(read_respond_header_list[index], read_respond_content_list[index]) for index in range(len(read_respond_content_list))]
+            self.readings = None
+        else:
+            self.reading_section_list = None
+            self.readings = Readings(input_str)
+
+    def get_html_list(self):
+        """Returns the list of strings representing the reading part when it's printed for HTML"""
+        output_list = ['<h4>{}</h4>'.format(self.header)]
+        if self.reading_section_list is not None:
+            output_list += [reading_section.get_html() for reading_section in self.reading_section_list]
+        else:
+            output_list.append(self.readings.get_html())
+        return output_list
+
+    def get_json_dict(self):
+        """Returns the dictionary representing the reading part in JSON"""
+        if self.reading_section_list is not None:
+            return {'header': self.header, 'sections': [reading_section.get_json_dict() for reading_section in self.reading_section_list]}
+        return {'header': self.header, 'readings': self.readings.get_json_list()}
+
+    def get_str_list(self):
+        """Returns the list of strings representing the reading part when it's printed"""
+        output_list = [self.header]
+        if self.reading_section_list is not None:
+            output_list += [str(reading_section) for reading_section in self.reading_section_list]
+        else:
+            output_list.append(str(self.readings))
+        return output_list
+
+def get_easter_vigil_part_list(input_str):
+    """Returns the list of reading parts for the Vigil of Easter in the input readings, or None if there is none"""
+    ev_re_compile = RE_PATTERN_REGISTRY.get('ev_reading_part')
+    if not ev_re_compile.search(input_str):
+        return None
+    ev_part_header_list = ev_re_compile.findall(input_str)
+    ev_part_content_list = ev_re_compile.split(input_str)[1:]
+    return [EasterVigilPart(ev_part_header_list[index], ev_part_content_list[index]) for index in range(len(ev_part_content_list))]
+
 class Feast:
     """Custom class for a feast item"""
+    __slots__ = ('input_str', 'section_span_list', 'raw_content_list', 'name', 'readings', 'easter_vigil_part_list', 'prayer_list', 'gospel_acclamation_list', 'color')
+
     def __init__(self, input_str):
         self.input_str = input_str
-        self.re_match = self.get_re_match()
+        self.section_span_list = self.get_section_span_list()
         self.raw_content_list = self.get_raw_content_list()
+        self.name, raw_readings, raw_prayer, raw_gospel_acclamation, self.color = self.raw_content_list
+        self.easter_vigil_part_list = get_easter_vigil_part_list(raw_readings)
+        self.readings = Readings(raw_readings) if self.easter_vigil_part_list is None else None
+        # the alternatives are kept with the 'or' between them, at the odd indices
+        self.prayer_list = RE_PATTERN_REGISTRY.get('or_split_keep_or').split(raw_prayer)
+        self.gospel_acclamation_list = RE_PATTERN_REGISTRY.get('or_split_keep_or').split(raw_gospel_acclamation)
 
-    def get_re_match(self):
-        """Returns the regex match object for the content being a feast"""
-        header_list = ['Readings', 'PrayeroftheDay', 'GospelAcclamation', 'Color']
-        header_whitespace_list = ['\s*'.join(header) for header in header_list]
-        section_re_list = ['{}\W*(\w.+\S)'.format(header) for header in header_whitespace_list]
-        re_pattern = '([A-Z].+\S)\s*{}'.format('\s*'.join(section_re_list))
-        return re.search(re_pattern, self.input_str)
+    def get_section_span_list(self):
+        """Returns the spans of the feast name and of the content after each header"""
+        return get_feast_section_span_list(self.input_str)
 
     def get_raw_content_list(self):
         """Gets the raw content list of the feast"""
-        return self.re_match.groups()
+        return [self.input_str[start:end] for start, end in self.section_span_list]
 
     def get_content_dict(self):
         """Cleans up the content list"""
-        raw_content_list = self.get_raw_content_list()
-        full_header_list = ['Feast name', 'Readings', 'Prayer of the Day', 'Gospel Acclamation', 'Color']
-        output_dict = {}
-        for index in range(len(full_header_list)):
-            header = full_header_list[index]
-            raw_content = raw_content_list[index]
-            if header in ['Prayer of the Day', 'Gospel Acclamation']:
-                content = re.split('\s+[Oo][Rr]\s+(?=[A-Z])', raw_content)
-            elif header == 'Readings':
-                ev_re_compile = re.compile(EV_READING_PART_RE_PATTERN)
-                ev_part_match = ev_re_compile.search(raw_content)
-                ev_part_header_list = ev_re_compile.findall(raw_content)
-                ev_part_content_list = ev_re_compile.split(raw_content)[1:]
-                content = []
-                if ev_part_match:
-                    ev_part_list = []
-                    for ev_part_content_index in range(len(ev_part_content_list)):
-                        ev_part_content = ev_part_content_list[ev_part_content_index]
-                        ev_part_list.append(ev_part_header_list[ev_part_content_index].strip())
-                        read_respond_re_compile = re.compile('|'.join(['[A-Za-z\s]+' + '\s*'.join('Reading:'), '\s*'.join('Response:')]))
-                        read_respond_match = read_respond_re_compile.search(ev_part_content)
-                        read_respond_header_list = read_respond_re_compile.findall(ev_part_content)
-                        read_respond_content_list = read_respond_re_compile.split(ev_part_content)[1:]
-                        if read_respond_match:
-                            for read_respond_content_index in range(len(read_respond_content_list)):
-                                read_respond_part_list = []
-                                read_respond_part_list.append(read_respond_header_list[read_respond_content_index].strip())
-                                read_respond_part_list.append(str(Readings(read_respond_content_list[read_respond_content_index])))
-                                ev_part_list.append(' '.join(read_respond_part_list))
-                        else:
-                            ev_part_list.append(str(Readings(ev_part_content)))
-                    content.append('\n\n'.join(ev_part_list))
-                else:
-                    content = Readings(raw_content)
-            else:
-                content = raw_content
-            output_dict[header] = content
-        return output_dict
+        if self.easter_vigil_part_list is not None:
+            ev_part_list = []
+            for ev_part in self.easter_vigil_part_list:
+                ev_part_list += ev_part.get_str_list()
+            readings_content = ['\n\n'.join(ev_part_list)]
+        else:
+            readings_content = self.readings
+        return {
+            'Feast name': self.name,
+            'Readings': readings_content,
+            'Prayer of the Day': self.prayer_list[::2],
+            'Gospel Acclamation': self.gospel_acclamation_list[::2],
+            'Color': self.color,
+        }
 
     def get_content_dict_html(self):
         """Cleans up the content list for HTML"""
-        raw_content_list = self.get_raw_content_list()
-        full_header_list = ['Feast name', 'Readings', 'Prayer of the Day', 'Gospel Acclamation', 'Color']
-        output_dict = {}
-        for index in range(len(full_header_list)):
-            header = full_header_list[index]
-            raw_content = raw_content_list[index]
-            if header in ['Prayer of the Day', 'Gospel Acclamation']:
-                content = re.split('\s+([Oo][Rr])\s+(?=[A-Z])', raw_content)
-            elif header == 'Readings':
-                ev_re_compile = re.compile(EV_READING_PART_RE_PATTERN)
-                ev_part_match = ev_re_compile.search(raw_content)
-                ev_part_header_list = ev_re_compile.findall(raw_content)
-                ev_part_content_list = ev_re_compile.split(raw_content)[1:]
-                content = []
-                if ev_part_match:
-                    ev_part_list = []
-                    for ev_part_content_index in range(len(ev_part_content_list)):
-                        ev_part_content = ev_part_content_list[ev_part_content_index]
-                        ev_part_list.append('<h4>{}</h4>'.format(ev_part_header_list[ev_part_content_index].strip()))
-                        read_respond_re_compile = re.compile('|'.join(['[A-Za-z\s]+' + '\s*'.join('Reading:'), '\s*'.join('Response:')]))
-                        read_respond_match = read_respond_re_compile.search(ev_part_content)
-                        read_respond_header_list = read_respond_re_compile.findall(ev_part_content)
-                        read_respond_content_list = read_respond_re_compile.split(ev_part_content)[1:]
-                        if read_respond_match:
-                            for read_respond_content_index in range(len(read_respond_content_list)):
-                                read_respond_part_list = []
-                                read_respond_part_list.append('<h5>{}</h5>'.format(read_respond_header_list[read_respond_content_index].strip()))
-                                read_respond_part_list.append(''.join(Readings(read_respond_content_list[read_respond_content_index]).get_html()))
-                                ev_part_list.append(' '.join(read_respond_part_list))
-                        else:
-                            ev_part_list.append(Readings(ev_part_content).get_html())
-                    content.append('\n\n'.join(ev_part_list))
-                else:
-                    content = Readings(raw_content).get_html()
-            else:
-                content = raw_content
-            output_dict[header] = content
+        if self.easter_vigil_part_list is not None:
+            ev_part_list = []
+            for ev_part in self.easter_vigil_part_list:
+                ev_part_list += ev_part.get_html_list()
+            readings_content = ['\n\n'.join(ev_part_list)]
+        else:
+            readings_content = self.readings.get_html()
+        return {
+            'Feast name': self.name,
+            'Readings': readings_content,
+            'Prayer of the Day': self.prayer_list,
+            'Gospel Acclamation': self.gospel_acclamation_list,
+            'Color': self.color,
+        }
+
+    def get_json_dict(self):
+        """Returns the dictionary representing the structure of the feast in JSON"""
+        output_dict = {'name': self.name}
+        if self.easter_vigil_part_list is not None:
+            output_dict['easter_vigil_parts'] = [ev_part.get_json_dict() for ev_part in self.easter_vigil_part_list]
+        else:
+            output_dict['readings'] = self.readings.get_json_list()
+        output_dict['prayer_of_the_day'] = self.prayer_list[::2]
+        output_dict['gospel_acclamation'] = self.gospel_acclamation_list[::2]
+        output_dict['color'] = self.color
         return output_dict
 
     def get_html(self):
@@ -332,12 +1143,12 @@ class Feast:
 class TxtFile:
     """Custom class for txt files"""
     def __init__(self, input_filepath):
-        self.object = open(input_filepath, 'r')
-        self.text = self.get_text()
+        with open(input_filepath, 'r') as infile:
+            self.text = infile.read()
 
     def get_text(self):
         """Gets the text from the txt file"""
-        return self.object.read()
+        return self.text
 
     def get_line_list(self):
         """Gets the list of lines in the txt file"""
@@ -347,165 +1158,886 @@ class TxtFile:
         """Gets the list of lines in the txt file with all blank lines removed"""
         return [line for line in self.get_line_list() if line]
 
-    def get_bible_book_re_pattern(self):
+    def get_bible_book_re_pattern(self, input_use_trie=True):
         """Gets the regex pattern to match a book of the Bible"""
-        bible_book_list = self.get_line_list_no_empty()
-        bible_book_whitespace_list = []
-        for bible_book in bible_book_list:
-            bible_book_word_whitespace_list = ['\s*'.join(word) for word in bible_book.split()]
-            bible_book_whitespace_list.append('\s'.join(bible_book_word_whitespace_list))
-        return '|'.join(bible_book_whitespace_list)
-
-    def get_easter_vigil_reading_parts_re_pattern(self):
-        """Gets the regex pattern to match a reading part for the Vigil of Easter"""
-        reading_part_list = [remove_char(reading_part, ' ') for reading_part in self.get_line_list_no_empty()]
-        reading_part_whitespace_list = ['\s*'.join(reading_part) for reading_part in reading_part_list]
-        return '|'.join(reading_part_whitespace_list)
-
-    def get_bible_bookname_no_whitespace_niv_map(self):
-        """Gets the dictionary mapping the a bookname of the Bible with no whitespace to the bookname in NIV"""
-        output_dict = {}
-        bible_bookname_row_list = self.get_line_list_no_empty()
-        for bible_bookname_row in bible_bookname_row_list:
-            bible_bookname_match = re.search('\|([^|]+)\|([^|]+)\|[^|]+\|', bible_bookname_row)
-            bookname_no_whitespace = bible_bookname_match.group(1)
-            bookname_niv = bible_bookname_match.group(2)
-            output_dict[bookname_no_whitespace] = bookname_niv
-        return output_dict
+        bible_book_token_list_list = [get_whitespace_token_list(bible_book) for bible_book in self.get_line_list_no_empty()]
+        return get_alternation_re_pattern(bible_book_token_list_list, input_use_trie)
 
-    def get_bible_bookname_no_whitespace_esv_map(self):
-        """Gets the dictionary mapping the a bookname of the Bible with no whitespace to the bookname in ESV"""
-        output_dict = {}
-        bible_bookname_row_list = self.get_line_list_no_empty()
-        for bible_bookname_row in bible_bookname_row_list:
-            bible_bookname_match = re.search('\|([^|]+)\|[^|]+\|([^|]+)\|', bible_bookname_row)
-            bookname_no_whitespace = bible_bookname_match.group(1)
-            bookname_esv = bible_bookname_match.group(2)
-            output_dict[bookname_no_whitespace] = bookname_esv
-        return output_dict
+    def get_easter_vigil_reading_parts_re_pattern(self, input_use_trie=True):
+        """Gets the regex pattern to match a reading part for the Vigil of Easter"""
+        reading_part_token_list_list = [get_whitespace_token_list(remove_char(reading_part, ' ')) for reading_part in self.get_line_list_no_empty()]
+        return get_alternation_re_pattern(reading_part_token_list_list, input_use_trie)
 
+# The txt files are the sources of the resource bundle below, only read by booklist_source_to_list.py and the benchmarks
 TXT1_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, 'books_of_the_bible.txt')
-TXT1_SOURCE_FILE = TxtFile(input_filepath=TXT1_SOURCE_FILEPATH)
-BIBLE_BOOK_RE_PATTERN = TXT1_SOURCE_FILE.get_bible_book_re_pattern()
 
 # TXT2_SOURCE_FILEPATH: 'book_lectionary_no_whitespace_kjv_map.txt' removed on Advent 2022 to use NIV/ESV and to save space
 
 TXT3_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, 'easter_vigil_reading_parts.txt')
-TXT3_SOURCE_FILE = TxtFile(input_filepath=TXT3_SOURCE_FILEPATH)
-EV_READING_PART_RE_PATTERN = TXT3_SOURCE_FILE.get_easter_vigil_reading_parts_re_pattern()
 
-TXT4_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, 'lectionary_no_whitespace_niv_esv_map.txt')
-TXT4_SOURCE_FILE = TxtFile(input_filepath=TXT4_SOURCE_FILEPATH)
-BIBLE_BOOKNAME_NWS_NIV_MAP = TXT4_SOURCE_FILE.get_bible_bookname_no_whitespace_niv_map()
-BIBLE_BOOKNAME_NWS_ESV_MAP = TXT4_SOURCE_FILE.get_bible_bookname_no_whitespace_esv_map()
+# TXT4_SOURCE_FILEPATH: 'lectionary_no_whitespace_niv_esv_map.txt' replaced by the NIV and ESV maps of the resource bundle
+
+TXT5_SOURCE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, 'apocryphal_no_whitespace_map.txt')
+
+@functools.lru_cache(maxsize=None)
+def get_txt_file(input_filepath):
+    """Gets the txt file with the input filepath, reading it on first use"""
+    return TxtFile(input_filepath=input_filepath)
+
+# The book maps, book names and regex patterns built from the txt files and the NIV and ESV booklists are precompiled by booklist_source_to_list.py into a resource bundle,
+# read once when a resource is first used, so importing this module stays cheap
+RESOURCE_BUNDLE_FILEPATH = os.path.join(SCRIPT_FOLDERPATH, 'lectionary_resources.json')
+
+# version of the content of the resource bundle, to increase whenever it changes for the same sources, e.g. when the regex patterns are built differently
+RESOURCE_BUNDLE_VERSION = 1
+
+RESOURCE_SOURCE_FILENAME_LIST = ['niv_booklist_source.txt', 'esv_booklist_source.txt', 'books_of_the_bible.txt', 'easter_vigil_reading_parts.txt', 'apocryphal_no_whitespace_map.txt']
+
+def get_is_resource_source_installed():
+    """Returns whether all the source files of the resource bundle are installed next to this module"""
+    return all(os.path.exists(os.path.join(SCRIPT_FOLDERPATH, source_filename)) for source_filename in RESOURCE_SOURCE_FILENAME_LIST)
+
+@functools.lru_cache(maxsize=None)
+def get_resource_bundle(input_filepath=RESOURCE_BUNDLE_FILEPATH):
+    """Gets the dictionary of the resource bundle in a single read, regenerating it first if its sources are installed and their checksum or the version differs from the one it was built with"""
+    import json
+    if get_is_resource_source_installed():
+        # imported here as it imports this module, the bundle is only rebuilt if it is out of date
+        import booklist_source_to_list
+        return booklist_source_to_list.update_resource_bundle(input_filepath)
+    # the folder of this module may be read-only and ship the bundle without its sources
+    with open(input_filepath) as infile:
+        resource_bundle = json.load(infile)
+    if resource_bundle.get('version') != RESOURCE_BUNDLE_VERSION:
+        raise ValueError('The resource bundle {} has version {!r} instead of {}, regenerate it with booklist_source_to_list.py'.format(input_filepath, resource_bundle.get('version'), RESOURCE_BUNDLE_VERSION))
+    return resource_bundle
+
+def get_bible_book_re_pattern():
+    """Gets the regex pattern to match a book of the Bible"""
+    return get_resource_bundle()['re_patterns']['bible_book']
+
+def get_ev_reading_part_re_pattern():
+    """Gets the regex pattern to match a reading part for the Vigil of Easter"""
+    return get_resource_bundle()['re_patterns']['ev_reading_part']
+
+def get_bible_bookname_nws_niv_map():
+    """Gets the dictionary mapping a bookname of the Bible with no whitespace to the bookname in NIV"""
+    return get_resource_bundle()['bookname_no_whitespace_niv_map']
+
+def get_bible_bookname_nws_esv_map():
+    """Gets the dictionary mapping a bookname of the Bible with no whitespace to the bookname in ESV"""
+    return get_resource_bundle()['bookname_no_whitespace_esv_map']
+
+# Book name recovery: in the readings, a capitalised word before a chapter and verse that is in no book name is replaced by the nearest last word of a book name whose other words are right before it
+import logging
+
+LOGGER = logging.getLogger('lectionary_pdf_to_json')
+
+def get_edit_distance(input_str_a, input_str_b):
+    """Gets the Levenshtein distance between two strings"""
+    previous_row = list(range(len(input_str_b) + 1))
+    for index_a, char_a in enumerate(input_str_a, 1):
+        row = [index_a]
+        for index_b, char_b in enumerate(input_str_b, 1):
+            row.append(min(previous_row[index_b] + 1, row[index_b - 1] + 1, previous_row[index_b - 1] + (char_a != char_b)))
+        previous_row = row
+    return previous_row[-1]
+
+class BkTree:
+    """Custom class for a BK-tree of words, finding the words within an edit distance of a word without comparing it to all of them"""
+    def __init__(self, input_word_list):
+        self.root = None
+        for word in input_word_list:
+            self.add(word)
+
+    def add(self, input_word):
+        """Adds a word, each node being a word with the dictionary of its children by their distance to it"""
+        if self.root is None:
+            self.root = (input_word, {})
+            return
+        node = self.root
+        while True:
+            distance = get_edit_distance(input_word, node[0])
+            if distance == 0:
+                return
+            if distance not in node[1]:
+                node[1][distance] = (input_word, {})
+                return
+            node = node[1][distance]
+
+    def search(self, input_word, input_max_distance):
+        """Gets the list of the words within the input edit distance of the input word with their distance, nearest first"""
+        output_list = []
+        node_list = [self.root] if self.root is not None else []
+        while node_list:
+            word, child_dict = node_list.pop()
+            distance = get_edit_distance(input_word, word)
+            if distance <= input_max_distance:
+                output_list.append((distance, word))
+            # by the triangle inequality, only the children at a distance in this range can be close enough
+            node_list += [child for child_distance, child in child_dict.items() if distance - input_max_distance <= child_distance <= distance + input_max_distance]
+        return sorted(output_list)
+
+@functools.lru_cache(maxsize=None)
+def get_book_name_word_to_book_name_list_dict():
+    """Gets the dictionary mapping each word of a book name of the Bible or of the Apocrypha to the list of the book names it is the last word of, empty if it is only in the middle of book names"""
+    book_name_list = get_resource_bundle()['bible_books'] + get_resource_bundle()['apocryphal_books']
+    output_dict = {}
+    for book_name in book_name_list:
+        word_list = book_name.split()
+        for word in word_list[:-1]:
+            output_dict.setdefault(word, [])
+        if book_name not in output_dict.setdefault(word_list[-1], []):
+            output_dict[word_list[-1]].append(book_name)
+    return output_dict
+
+@functools.lru_cache(maxsize=None)
+def get_book_name_bk_tree():
+    """Gets the BK-tree of the last words of the book names, built once"""
+    return BkTree([word for word, book_name_list in get_book_name_word_to_book_name_list_dict().items() if book_name_list])
+
+def get_book_name_recovery_re_pattern():
+    """Returns the regex pattern of a capitalised word right before a chapter and verse, with a group for the word and for the chapter and verse"""
+    return '(?<![A-Za-z])([A-Z][a-z]+)(?=\s*([0-9]+\s*:\s*[0-9]+))'
+
+@functools.lru_cache(maxsize=None)
+def get_recovered_book_name_word(input_word):
+    """Gets the last word of the book name nearest to the input word within the edit distance limit, None if the word is in a book name, ignored, too short, too far from any book name or as near to several"""
+    recovery_config_dict = get_error_correction_config()['book_name_recovery']
+    if input_word in get_book_name_word_to_book_name_list_dict() or input_word in recovery_config_dict['ignored_words'] or len(input_word) < recovery_config_dict['min_word_length']:
+        return None
+    # a third of the letters at most, so that a short word is not taken for any short book name
+    max_distance = min(recovery_config_dict['max_edit_distance'], len(input_word) // 3)
+    distance_word_list = get_book_name_bk_tree().search(input_word, max_distance) if max_distance else []
+    if not distance_word_list or (len(distance_word_list) > 1 and distance_word_list[1][0] == distance_word_list[0][0]):
+        return None
+    return distance_word_list[0][1]
+
+def get_is_book_name_start_before(input_str, input_end, input_book_name):
+    """Returns whether the words of a book name before its last word are right before the input end of the input string, whitespace aside, always true for a book name of one word"""
+    start_word_list = input_book_name.split()[:-1]
+    if not start_word_list:
+        return True
+    start_re_compile = get_re_compile('(?<![A-Za-z0-9]){}\s*$'.format('\s*'.join(re.escape(word) for word in start_word_list)))
+    # the words and the whitespace between them are within twice the length of the book name
+    return start_re_compile.search(input_str, max(0, input_end - 2 * len(input_book_name)), input_end) is not None
+
+def recover_book_names(input_str):
+    """Returns the input readings with each capitalised word right before a chapter and verse replaced by the nearest last word of a book name if it is in no book name, and if the other words of that book name are right before it, logging each replacement"""
+    def replace(input_match):
+        recovered_word = get_recovered_book_name_word(input_match.group(1))
+        if recovered_word is None:
+            return input_match.group(1)
+        # e.g. King is only recovered as Kings after 1 or 2, which is not a book on its own
+        book_name_list = [book_name for book_name in get_book_name_word_to_book_name_list_dict()[recovered_word] if get_is_book_name_start_before(input_str, input_match.start(1), book_name)]
+        if not book_name_list:
+            return input_match.group(1)
+        LOGGER.warning('Recovered book name %r from %r before %s', book_name_list[0], input_match.group(1), input_match.group(2))
+        if PROFILER is not None:
+            PROFILER.count('recovered_book_names')
+        return recovered_word
+    return RE_PATTERN_REGISTRY.get('book_name_recovery').sub(replace, input_str)
+
+RE_PATTERN_REGISTRY.register('bible_book', get_bible_book_re_pattern)
+RE_PATTERN_REGISTRY.register('ev_reading_part', get_ev_reading_part_re_pattern)
+RE_PATTERN_REGISTRY.register('book_name_recovery', get_book_name_recovery_re_pattern)
+
+LAZY_RESOURCE_NAME_TO_GETTER_DICT = {
+    'BIBLE_BOOK_RE_PATTERN': get_bible_book_re_pattern,
+    'EV_READING_PART_RE_PATTERN': get_ev_reading_part_re_pattern,
+    'BIBLE_BOOKNAME_NWS_NIV_MAP': get_bible_bookname_nws_niv_map,
+    'BIBLE_BOOKNAME_NWS_ESV_MAP': get_bible_bookname_nws_esv_map,
+    'PDF_SOURCE_FILENAME_TO_ERROR_CORRECTION_MAP_DICT': get_pdf_source_filename_to_error_correction_map_dict,
+    'PDF_SOURCE_TITLE_TO_ERROR_CORRECTION_MAP_DICT': get_pdf_source_title_to_error_correction_map_dict,
+}
+
+def __getattr__(name):
+    """Loads the resources that used to be module constants on first access"""
+    if name in LAZY_RESOURCE_NAME_TO_GETTER_DICT:
+        return LAZY_RESOURCE_NAME_TO_GETTER_DICT[name]()
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
 # Phase 7: Extract JSON file for the verses in the Bible
 # Removed on Advent 2022 because output will be too bulky, will use links instead
 
+# The cleanup of a chapter and verse string, as displayed and as used in the HTML links
+READING_REF_CACHE_SIZE = 4096
+CHAPTER_VERSE_STR_PATTERN_REPL_LIST = [
+    ('[(][^)]*[)]|[{][^}]*[}]|\[[^\]]*\]', ' '),
+    ('and', ';'),
+    ('[A-Za-z]|(?<=[^\w\s])\s+|\s+(?=[^\w\s])', ''),
+    ('^\W+(?=\w)|(?<=\w)\W+$|^\W*$', ''),
+]
+CHAPTER_VERSE_STR_URL_PATTERN_REPL_LIST = [
+    ('\s+', ';'),
+    ('[^\w:-;,]', '-'),
+]
+
+@functools.lru_cache(maxsize=None)
+def get_re_compile(input_pattern):
+    """Gets the compiled regex pattern of a cleanup step, compiled once"""
+    return re.compile(input_pattern)
+
+def clean_chapter_verse_str(input_str, input_pattern_repl_list):
+    """Returns the chapter and verse string with each regex pattern in the input list replaced in order"""
+    output_str = input_str
+    for pattern, repl in input_pattern_repl_list:
+        output_str = get_re_compile(pattern).sub(repl, output_str)
+    return output_str
+
+@functools.lru_cache(maxsize=READING_REF_CACHE_SIZE)
+def get_chapter_verse_str_clean_url(input_chapter_verse_str):
+    """Gets the chapter and verse string as displayed and as used in the links, the latter interned as part of the canonical reference"""
+    chapter_verse_str_clean = clean_chapter_verse_str(input_chapter_verse_str, CHAPTER_VERSE_STR_PATTERN_REPL_LIST)
+    return chapter_verse_str_clean, sys.intern(clean_chapter_verse_str(chapter_verse_str_clean, CHAPTER_VERSE_STR_URL_PATTERN_REPL_LIST))
+
+class ReadingRef:
+    """Custom class for a reference to a reading of the Bible, parsed once from its book and chapter and verse string"""
+    __slots__ = ('book', 'chapter_verse_str', 'chapter_verse_str_clean', 'chapter_verse_str_url', 'niv_bookname', 'esv_bookname')
+
+    def __init__(self, input_book, input_chapter_verse_str):
+        self.book = input_book
+        self.chapter_verse_str = input_chapter_verse_str
+        self.chapter_verse_str_clean, self.chapter_verse_str_url = get_chapter_verse_str_clean_url(input_chapter_verse_str)
+        book_no_whitespace = input_book.replace(' ', '')
+        self.niv_bookname = get_bible_bookname_nws_niv_map().get(book_no_whitespace)
+        self.esv_bookname = get_bible_bookname_nws_esv_map().get(book_no_whitespace)
+
+    def get_is_supported(self):
+        """Returns whether the book of the reading has a link"""
+        return self.niv_bookname is not None
+
+    def get_chapter_verse_range_list(self):
+        """Gets the list of chapter and verse ranges of the reading, e.g. ['9:15-19', '10:1']"""
+        return [chapter_verse_range for chapter_verse_range in re.split(',|;', self.chapter_verse_str_url) if chapter_verse_range]
+
+    def get_niv_url(self, input_chapter_verse_str, input_version_suffix=''):
+        """Gets the URL of the reading in the NIV"""
+        return 'https://www.biblegateway.com/passage/?search={}+{}&version=NIV{}'.format(self.niv_bookname.replace(' ', '+'), input_chapter_verse_str, input_version_suffix)
+
+    def get_esv_url(self, input_chapter_verse_str):
+        """Gets the URL of the reading in the ESV"""
+        return 'https://www.esv.org/verses/{}+{}/'.format(self.esv_bookname.replace(' ', '+'), input_chapter_verse_str)
+
+    def get_content(self):
+        """Gets the links to the reading, as displayed when printed"""
+        if not self.get_is_supported():
+            return 'This reading is not supported..'
+        return '<p>Text: <a href="{}">New International Version (NIV)</a> . <a href="{}">English Standard Version (ESV)</a></p>'.format(self.get_niv_url(self.chapter_verse_str_clean), self.get_esv_url(self.chapter_verse_str_clean))
+
+    def get_content_html(self):
+        """Gets the links to the reading for HTML, rendered once for each canonical reference"""
+        if not self.get_is_supported():
+            return '<p>This reading is not supported..</p>'
+        return get_reading_link_html(self.niv_bookname, self.esv_bookname, self.chapter_verse_str_url)
+
+    def get_html(self):
+        """Gets the html to represent this reading"""
+        return '<p><b>{} {}</b></p> {}'.format(self.book, self.chapter_verse_str, self.get_content_html())
+
+    def get_json_dict(self):
+        """Gets the dictionary representing this reading in JSON"""
+        output_dict = {'book': self.book, 'chapter_verse': self.chapter_verse_str, 'ranges': self.get_chapter_verse_range_list()}
+        if self.get_is_supported():
+            output_dict['niv_url'] = self.get_niv_url(self.chapter_verse_str_url, '/')
+            output_dict['esv_url'] = self.get_esv_url(self.chapter_verse_str_url)
+        return output_dict
+
+    def __str__(self):
+        return '{} {}\n\n{}'.format(self.book, self.chapter_verse_str, self.get_content())
+
+# The same readings come back across a lectionary year, so the references and their links are memoised in bounded LRU caches
+@functools.lru_cache(maxsize=READING_REF_CACHE_SIZE)
+def get_reading_ref(input_book, input_chapter_verse_str):
+    """Gets the reading reference of a book and chapter and verse string, shared by all the readings with the same ones"""
+    return ReadingRef(input_book, input_chapter_verse_str)
+
+@functools.lru_cache(maxsize=READING_REF_CACHE_SIZE)
+def get_reading_link_html(input_niv_bookname, input_esv_bookname, input_chapter_verse_str_url):
+    """Gets the HTML of the NIV and ESV links to a canonical reference"""
+    niv_url = 'https://www.biblegateway.com/passage/?search={}+{}&version=NIV/'.format(input_niv_bookname.replace(' ', '+'), input_chapter_verse_str_url)
+    esv_url = 'https://www.esv.org/verses/{}+{}/'.format(input_esv_bookname.replace(' ', '+'), input_chapter_verse_str_url)
+    return '<p>Text: <a href="{}">New International Version (NIV)</a> . <a href="{}">English Standard Version (ESV)</a></p>'.format(niv_url, esv_url)
+
+def get_lru_cache_stats_dict(input_function):
+    """Gets the hits, misses, size and hit rate of the LRU cache of a function"""
+    cache_info = input_function.cache_info()
+    num_calls = cache_info.hits + cache_info.misses
+    return {'hits': cache_info.hits, 'misses': cache_info.misses, 'size': cache_info.currsize, 'hit_rate': cache_info.hits / num_calls if num_calls else 0.0}
+
+def get_reading_ref_cache_stats_dict():
+    """Gets the statistics of the caches of the reading references and of their links"""
+    return {function.__name__: get_lru_cache_stats_dict(function) for function in [get_chapter_verse_str_clean_url, get_reading_ref, get_reading_link_html]}
+
 class Readings:
     """Custom class for the lectionary item readings"""
+    __slots__ = ('input_str', 'book_list', 'chapter_verse_str_list', 'reading_ref_list')
+
     def __init__(self, input_str):
-        self.input_str = input_str
+        # the book names are only recovered in the readings, never in the prayers or the headers
+        self.input_str = recover_book_names(input_str)
         self.book_list, self.chapter_verse_str_list = self.get_book_chapter_verse_str_lists()
+        self.reading_ref_list = [get_reading_ref(self.book_list[index], self.chapter_verse_str_list[index]) for index in range(len(self.book_list))]
 
     def get_book_chapter_verse_str_lists(self):
         """Get a list of Bible books and a list of chapters and verses from the input string"""
-        bible_re_compile = re.compile(BIBLE_BOOK_RE_PATTERN)
+        bible_re_compile = RE_PATTERN_REGISTRY.get('bible_book')
         bible_book_list = bible_re_compile.findall(self.input_str)
         bible_chapter_verse_str_list = [verses.strip() for verses in bible_re_compile.split(self.input_str)[1:]]
         return bible_book_list, bible_chapter_verse_str_list
 
     def get_content_list(self):
         """Get a list of contents from the list of chapters and verses"""
-        output_list = []
-        for index in range(len(self.book_list)):
-            book = self.book_list[index]
-            book_no_whitespace = book.replace(' ', '')
-            chapter_verse_str = self.chapter_verse_str_list[index]
-            chapter_verse_str_no_brackets = re.sub('[(][^)]*[)]|[{][^}]*[}]|\[[^\]]*\]', ' ', chapter_verse_str)
-            chapter_verse_str_and_split = re.sub('and', ';', chapter_verse_str_no_brackets)
-            chapter_verse_str_unstrip = re.sub('[A-Za-z]|(?<=[^\w\s])\s+|\s+(?=[^\w\s])', '', chapter_verse_str_and_split)
-            chapter_verse_str_clean = re.sub('^\W+(?=\w)|(?<=\w)\W+$|^\W*$', '', chapter_verse_str_unstrip)
-            chapter_verse_list = re.split(',|;|\s+', chapter_verse_str_clean)
-            if book_no_whitespace in BIBLE_BOOKNAME_NWS_NIV_MAP.keys():
-                niv_bookname = BIBLE_BOOKNAME_NWS_NIV_MAP[book_no_whitespace]
-                niv_url_bookname = niv_bookname.replace(' ', '+')
-                niv_url = 'https://www.biblegateway.com/passage/?search={}+{}&version=NIV'.format(niv_url_bookname, chapter_verse_str_clean)
-                esv_bookname = BIBLE_BOOKNAME_NWS_ESV_MAP[book_no_whitespace]
-                esv_url_bookname = esv_bookname.replace(' ', '+')
-                esv_url = 'https://www.esv.org/verses/{}+{}/'.format(esv_url_bookname, chapter_verse_str_clean)
-                output_list.append('<p>Text: <a href="{}">New International Version (NIV)</a> . <a href="{}">English Standard Version (ESV)</a></p>'.format(niv_url, esv_url))
-            else:
-                output_str = 'This reading is not supported..'
-                output_list.append(output_str)
-        return output_list
+        return [reading_ref.get_content() for reading_ref in self.reading_ref_list]
 
     def get_content_list_html(self):
         """Get a list of contents from the list of chapters and verses"""
-        output_list = []
-        for index in range(len(self.book_list)):
-            chapter_verse_str_pattern_repl_map = {
-                '[(][^)]*[)]|[{][^}]*[}]|\[[^\]]*\]': ' ',
-                'and': ';',
-                '[A-Za-z]|(?<=[^\w\s])\s+|\s+(?=[^\w\s])': '',
-                '^\W+(?=\w)|(?<=\w)\W+$|^\W*$': '',
-                '\s+': ';',
-                '[^\w:-;,]': '-',
-            }
-            book = self.book_list[index]
-            book_no_whitespace = book.replace(' ', '')
-            chapter_verse_str = self.chapter_verse_str_list[index]
-            chapter_verse_str_clean = chapter_verse_str
-            for chapter_verse_str_pattern in chapter_verse_str_pattern_repl_map.keys():
-                chapter_verse_str_repl = chapter_verse_str_pattern_repl_map[chapter_verse_str_pattern]
-                chapter_verse_str_clean = re.sub(chapter_verse_str_pattern, chapter_verse_str_repl, chapter_verse_str_clean)
-            chapter_verse_list = re.split(',|;|\s+', chapter_verse_str_clean)
-            if book_no_whitespace in BIBLE_BOOKNAME_NWS_NIV_MAP.keys():
-                niv_bookname = BIBLE_BOOKNAME_NWS_NIV_MAP[book_no_whitespace]
-                niv_url_bookname = niv_bookname.replace(' ', '+')
-                niv_url = 'https://www.biblegateway.com/passage/?search={}+{}&version=NIV/'.format(niv_url_bookname, chapter_verse_str_clean)
-                esv_bookname = BIBLE_BOOKNAME_NWS_ESV_MAP[book_no_whitespace]
-                esv_url_bookname = esv_bookname.replace(' ', '+')
-                esv_url = 'https://www.esv.org/verses/{}+{}/'.format(esv_url_bookname, chapter_verse_str_clean)
-                output_list.append('<p>Text: <a href="{}">New International Version (NIV)</a> . <a href="{}">English Standard Version (ESV)</a></p>'.format(niv_url, esv_url))
-            else:
-                output_str = '<p>This reading is not supported..</p>'
-                output_list.append(output_str)
-        return output_list
+        return [reading_ref.get_content_html() for reading_ref in self.reading_ref_list]
 
     def get_html(self):
         """Gets the html to represent this reading/readings"""
-        book_list, chapter_verse_str_list = self.get_book_chapter_verse_str_lists()
-        content_list = self.get_content_list_html()
-        output_str_list = []
-        for index in range(len(book_list)):
-            bible_book = book_list[index]
-            chapter_verse_str = chapter_verse_str_list[index]
-            content = content_list[index]
-            output_str_list.append('<p><b>{} {}</b></p> {}'.format(bible_book, chapter_verse_str, content))
-        return '\n\n'.join(output_str_list)
+        return '\n\n'.join(reading_ref.get_html() for reading_ref in self.reading_ref_list)
+
+    def get_json_list(self):
+        """Gets the list of dictionaries representing this reading/readings in JSON"""
+        return [reading_ref.get_json_dict() for reading_ref in self.reading_ref_list]
 
     def __str__(self):
-        book_list, chapter_verse_str_list = self.get_book_chapter_verse_str_lists()
-        content_list = self.get_content_list()
-        output_str_list = []
-        for index in range(len(book_list)):
-            bible_book = book_list[index]
-            chapter_verse_str = chapter_verse_str_list[index]
-            content = content_list[index]
-            output_str_list.append('{} {}\n\n{}'.format(bible_book, chapter_verse_str, content))
-        return '\n\n'.join(output_str_list)
-
-DATE_TO_LECTIONARY_ITEM_LIST_DICT = process_phase_2_to_4(PDF_SOURCE_FILE_TEXT_NO_NEWLINE)
+        return '\n\n'.join(str(reading_ref) for reading_ref in self.reading_ref_list)
+
+def iter_lectionary_page_texts(pdf_path, workers=1, cache_path=None, extractor=DEFAULT_PDF_TEXT_EXTRACTOR_NAME, page_text_cache=None):
+    """Yields the text of each page of the lectionary PDF file at the input path, closing the PDF file and the page text cache once done, unless the page text cache is given already open instead of its path"""
+    is_page_text_cache_owned = page_text_cache is None and bool(cache_path)
+    if is_page_text_cache_owned:
+        page_text_cache = PageTextCache(input_filepath=cache_path)
+    pdf_file = PdfFile(input_filepath=pdf_path, input_page_text_cache=page_text_cache, input_extractor_name=extractor)
+    try:
+        yield from pdf_file.iter_page_texts(workers=workers)
+    finally:
+        pdf_file.close()
+        if is_page_text_cache_owned:
+            page_text_cache.close()
 
+def iter_lectionary_segments(pdf_path, start_date=None, error_correction_map=None, workers=1, cache_path=None, extractor=DEFAULT_PDF_TEXT_EXTRACTOR_NAME, page_text_cache=None):
+    """Segments the lectionary PDF file at the input path a page at a time, yielding each date from the start date, inferred from the PDF file if not given, with the list of its segments"""
+    return iter_windowed_date_segment_lists(iter_lectionary_page_texts(pdf_path, workers=workers, cache_path=cache_path, extractor=extractor, page_text_cache=page_text_cache), start_date, error_correction_map, pdf_path)
+
+def iter_lectionary(pdf_path, start_date=None, error_correction_map=None, workers=1, cache_path=None, extractor=DEFAULT_PDF_TEXT_EXTRACTOR_NAME):
+    """Parses the lectionary PDF file at the input path, yielding each date from the start date, inferred from the PDF file if not given, with its list of lectionary items"""
+    for date, segment_list in iter_lectionary_segments(pdf_path, start_date, error_correction_map=error_correction_map, workers=workers, cache_path=cache_path, extractor=extractor):
+        yield date, get_lectionary_item_list(date, segment_list)
+
+def parse_lectionary(pdf_path, start_date=None, error_correction_map=None, workers=1, cache_path=None, extractor=DEFAULT_PDF_TEXT_EXTRACTOR_NAME):
+    """Parses the lectionary PDF file at the input path into a dictionary mapping each date from the start date, inferred from the PDF file if not given, to its list of lectionary items"""
+    return dict(iter_lectionary(pdf_path, start_date, error_correction_map=error_correction_map, workers=workers, cache_path=cache_path, extractor=extractor))
+
+# Phase 5: Write the lectionary items to a JSON file
 import json
-# Verify capturing of contents (Phase 5)
-if __name__ == "__main__":
+
+def get_date_str(input_date):
+    """Gets the string of a date as used in the JSON file"""
+    return '{}/{:0>2}/{:0>2}'.format(input_date.year, input_date.month, input_date.day)
+
+def get_lectionary_record(input_date, input_lectionary_item_list, input_structured=False):
+    """Gets the dictionary to dump to JSON for a date and its list of lectionary items, with the structure of each item under 'items' if requested"""
+    lectionary_html_list = [remove_char(lectionary_item.get_html(), '\n') for lectionary_item in input_lectionary_item_list]
+    output_dict = {'date': get_date_str(input_date), 'html': lectionary_html_list}
+    if input_structured:
+        output_dict['items'] = [lectionary_item.get_json_dict() for lectionary_item in input_lectionary_item_list]
+    return output_dict
+
+def get_lectionary_output_dict(input_dict):
+    """Gets the dictionary to dump to JSON from a dictionary mapping dates to lists of lectionary items"""
     output_dict = {'main': []}
-    for date in DATE_TO_LECTIONARY_ITEM_LIST_DICT.keys():
-        lectionary_item_list = DATE_TO_LECTIONARY_ITEM_LIST_DICT[date]
-        lectionary_html_list = [remove_char(lectionary_item.get_html(), '\n') for lectionary_item in lectionary_item_list]
-        date_to_html_list_dict = {'date': '{}/{:0>2}/{:0>2}'.format(date.year, date.month, date.day), 'html': lectionary_html_list}
-        output_dict['main'].append(date_to_html_list_dict)
-    with open('lectionary.json', 'w') as outfile:
-        json.dump(output_dict, outfile)
+    for date in input_dict.keys():
+        output_dict['main'].append(get_lectionary_record(date, input_dict[date]))
+    return output_dict
+
+def open_temp_file(input_filepath, input_mode='w'):
+    """Opens a temporary file for writing in the folder of the input path, to rename to it once complete, and returns it with its path"""
+    import tempfile
+    file_descriptor, temp_filepath = tempfile.mkstemp(prefix='.{}.'.format(os.path.basename(input_filepath)), suffix='.tmp', dir=os.path.dirname(os.path.abspath(input_filepath)))
+    # give the output the permissions of a file created with open
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(temp_filepath, 0o666 & ~umask)
+    # text is written as UTF-8 with its newlines as is on every platform, so that the bytes counted by the writers are the bytes in the file
+    text_kwarg_dict = {} if 'b' in input_mode else {'encoding': 'utf-8', 'newline': ''}
+    return os.fdopen(file_descriptor, input_mode, **text_kwarg_dict), temp_filepath
+
+class LectionaryJsonWriter:
+    """Custom class writing the lectionary records to a temporary file one at a time, as a JSON file with the same schema as get_lectionary_output_dict or as a JSON Lines file, and renaming it to the output path once complete"""
+    def __init__(self, input_filepath, input_json_lines=False, input_structured=False):
+        self.filepath = input_filepath
+        self.json_lines = input_json_lines
+        self.structured = input_structured
+        self.num_records = 0
+        # byte offset in the file of the next string written
+        self.num_bytes = 0
+        self.date_str_to_record_range_dict = {}
+        self.object, self.temp_filepath = open_temp_file(input_filepath)
+        if not self.json_lines:
+            self.write_str('{"main": [')
+
+    def write_str(self, input_str):
+        """Writes a string, counting its bytes"""
+        self.object.write(input_str)
+        self.num_bytes += len(input_str.encode('utf-8'))
+
+    def write_record(self, input_record):
+        """Writes a lectionary record, keeping the byte offset and byte length of the record of its date"""
+        record_str = json.dumps(input_record)
+        if not self.json_lines and self.num_records:
+            self.write_str(', ')
+        self.date_str_to_record_range_dict[input_record['date']] = [self.num_bytes, len(record_str.encode('utf-8'))]
+        self.write_str(record_str)
+        if self.json_lines:
+            self.write_str('\n')
+        self.num_records += 1
+
+    def write(self, input_date, input_lectionary_item_list):
+        """Renders and writes the record of a date and its list of lectionary items"""
+        if PROFILER is None:
+            self.write_record(get_lectionary_record(input_date, input_lectionary_item_list, self.structured))
+            return
+        render_start_time = time.perf_counter()
+        record = get_lectionary_record(input_date, input_lectionary_item_list, self.structured)
+        write_start_time = time.perf_counter()
+        self.write_record(record)
+        PROFILER.add_phase_time('html_rendering', write_start_time - render_start_time)
+        PROFILER.add_phase_time('json_serialisation', time.perf_counter() - write_start_time)
+        PROFILER.add_date_time(input_date, 'render_time', write_start_time - render_start_time)
+
+    def write_footer(self):
+        """Writes the end of the file after the last record"""
+        if not self.json_lines:
+            self.write_str(']}')
+
+    def close(self):
+        """Completes the temporary file and renames it to the output path"""
+        self.write_footer()
+        self.object.flush()
+        os.fsync(self.object.fileno())
+        self.object.close()
+        os.replace(self.temp_filepath, self.filepath)
+
+    def abort(self):
+        """Removes the temporary file, leaving any previous output untouched"""
+        self.object.close()
+        os.remove(self.temp_filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def write_lectionary_json(input_filepath, input_date_lectionary_item_list_iter, input_json_lines=False, input_structured=False):
+    """Writes each date with its list of lectionary items to a JSON or JSON Lines file as soon as it is yielded, returning the number of dates"""
+    with LectionaryJsonWriter(input_filepath, input_json_lines, input_structured) as writer:
+        for date, lectionary_item_list in input_date_lectionary_item_list_iter:
+            writer.write(date, lectionary_item_list)
+    return writer.num_records
+
+def write_precompressed_files(input_filepath):
+    """Writes the gzip version and, if the brotli package is installed, the Brotli version of a file next to it, for a web server to send as is, returning the list of their paths"""
+    import gzip
+    with open(input_filepath, 'rb') as infile:
+        content = infile.read()
+    # no timestamp in the gzip header, so that the same content gives the same file
+    extension_to_compressed_content_dict = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        extension_to_compressed_content_dict['.br'] = brotli.compress(content, quality=11)
+    output_filepath_list = []
+    for extension, compressed_content in extension_to_compressed_content_dict.items():
+        outfile, temp_filepath = open_temp_file(input_filepath + extension, 'wb')
+        with outfile:
+            outfile.write(compressed_content)
+        os.replace(temp_filepath, input_filepath + extension)
+        output_filepath_list.append(input_filepath + extension)
+    return output_filepath_list
+
+# Sharded output: one JSON Lines file of the records of each month and an index of the byte range of the record of each date
+SHARD_INDEX_FILENAME = 'index.json'
+
+def get_shard_filename(input_date):
+    """Gets the filename of the shard of the month of a date"""
+    return '{}-{:0>2}.jsonl'.format(input_date.year, input_date.month)
+
+class LectionaryShardWriter:
+    """Custom class writing the lectionary records to one JSON Lines shard per month in a folder, with the index mapping each date to the shard, byte offset and byte length of its record, each file written to a temporary file and renamed once complete"""
+    def __init__(self, input_folderpath, input_structured=False):
+        os.makedirs(input_folderpath, exist_ok=True)
+        self.folderpath = input_folderpath
+        self.structured = input_structured
+        self.num_records = 0
+        self.date_str_to_shard_range_dict = {}
+        self.shard_filename = None
+        self.object = None
+        self.temp_filepath_to_filepath_dict = {}
+
+    def open_shard(self, input_shard_filename):
+        """Completes the current shard and opens the temporary file of the next one"""
+        if self.object is not None:
+            self.object.close()
+        filepath = os.path.join(self.folderpath, input_shard_filename)
+        self.object, temp_filepath = open_temp_file(filepath, 'wb')
+        self.temp_filepath_to_filepath_dict[temp_filepath] = filepath
+        self.shard_filename = input_shard_filename
+
+    def write_record(self, input_record):
+        """Writes a lectionary record to the shard of its month"""
+        date = datetime.date(*map(int, input_record['date'].split('/')))
+        shard_filename = get_shard_filename(date)
+        if shard_filename != self.shard_filename:
+            self.open_shard(shard_filename)
+        record_bytes = json.dumps(input_record).encode('utf-8')
+        self.date_str_to_shard_range_dict[date.isoformat()] = [shard_filename, self.object.tell(), len(record_bytes)]
+        self.object.write(record_bytes)
+        self.object.write(b'\n')
+        self.num_records += 1
+
+    def write(self, input_date, input_lectionary_item_list):
+        """Renders and writes the record of a date and its list of lectionary items"""
+        self.write_record(get_lectionary_record(input_date, input_lectionary_item_list, self.structured))
+
+    def close(self):
+        """Completes the temporary files and renames them to their paths, the index last"""
+        if self.object is not None:
+            self.object.close()
+        index_file, index_temp_filepath = open_temp_file(os.path.join(self.folderpath, SHARD_INDEX_FILENAME))
+        with index_file:
+            json.dump(self.date_str_to_shard_range_dict, index_file, separators=(',', ':'))
+        self.temp_filepath_to_filepath_dict[index_temp_filepath] = os.path.join(self.folderpath, SHARD_INDEX_FILENAME)
+        for temp_filepath, filepath in self.temp_filepath_to_filepath_dict.items():
+            os.replace(temp_filepath, filepath)
+
+    def abort(self):
+        """Removes the temporary files, leaving any previous shards untouched"""
+        if self.object is not None:
+            self.object.close()
+        for temp_filepath in self.temp_filepath_to_filepath_dict.keys():
+            os.remove(temp_filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def write_lectionary_shards(input_folderpath, input_date_lectionary_item_list_iter, input_structured=False):
+    """Writes each date with its list of lectionary items to the shard of its month in the output folder as soon as it is yielded, with the index of the dates, returning the number of dates"""
+    with LectionaryShardWriter(input_folderpath, input_structured) as writer:
+        for date, lectionary_item_list in input_date_lectionary_item_list_iter:
+            writer.write(date, lectionary_item_list)
+    return writer.num_records
+
+# Parallel rendering: the dates are parsed and rendered to their records in chunks in a pool of worker processes, and yielded in date order
+import collections
+
+# dates per task, enough to amortise sending the segments and the records between processes
+# starting the worker processes and sending them the segments costs about as much as rendering a few hundred dates, so the dates are sent in large chunks
+RENDER_CHUNK_SIZE = 256
+
+def init_render_worker():
+    """Custom function for a worker process to read the resource bundle and compile the regex patterns once, before its first chunk"""
+    # a forked worker inherits the profiler of the parent process, whose records it could not send back
+    if PROFILER is not None:
+        PROFILER.uninstall()
+    get_resource_bundle()
+    RE_PATTERN_REGISTRY.compile_all()
+
+def render_date_segment_list_chunk(input_date_segment_list_chunk, input_structured=False):
+    """Custom function for a worker process to get the list of dates with their lectionary record from a list of dates with their segments"""
+    return [(date, get_lectionary_record(date, get_lectionary_item_list(date, segment_list), input_structured)) for date, segment_list in input_date_segment_list_chunk]
+
+def iter_rendered_lectionary_records(input_date_segment_list_iter, input_structured=False, input_workers=1, input_chunk_size=RENDER_CHUNK_SIZE):
+    """Yields each date with its lectionary record in date order, parsed and rendered from its segments in chunks in a pool of the input number of worker processes, or in this process for one worker or fewer dates than a chunk per worker"""
+    date_segment_list_iter = iter(input_date_segment_list_iter)
+    head_date_segment_list_list = list(itertools.islice(date_segment_list_iter, input_workers * input_chunk_size)) if input_workers > 1 else []
+    if len(head_date_segment_list_list) < input_workers * input_chunk_size:
+        # the pool would not pay for itself, e.g. for a single year of dates
+        for date, segment_list in itertools.chain(head_date_segment_list_list, date_segment_list_iter):
+            yield date, get_lectionary_record(date, get_lectionary_item_list(date, segment_list), input_structured)
+        return
+    import concurrent.futures
+    date_segment_list_iter = itertools.chain(head_date_segment_list_list, date_segment_list_iter)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=input_workers, initializer=init_render_worker) as executor:
+        # at most two chunks per worker in flight, so that the segments are not all read ahead of the writing
+        future_deque = collections.deque()
+        while True:
+            while len(future_deque) < input_workers * 2:
+                date_segment_list_chunk = list(itertools.islice(date_segment_list_iter, input_chunk_size))
+                if not date_segment_list_chunk:
+                    break
+                future_deque.append(executor.submit(render_date_segment_list_chunk, date_segment_list_chunk, input_structured))
+            if not future_deque:
+                return
+            if PROFILER is None:
+                yield from future_deque.popleft().result()
+                continue
+            wait_start_time = time.perf_counter()
+            date_record_list = future_deque.popleft().result()
+            PROFILER.add_phase_time('parallel_rendering_wait', time.perf_counter() - wait_start_time)
+            PROFILER.count('rendered_chunks')
+            yield from date_record_list
+
+def write_lectionary_records(input_writer, input_date_record_iter):
+    """Writes each lectionary record to the input writer as soon as it is yielded, returning the number of records"""
+    with input_writer as writer:
+        for date, record in input_date_record_iter:
+            if PROFILER is None:
+                writer.write_record(record)
+                continue
+            write_start_time = time.perf_counter()
+            writer.write_record(record)
+            PROFILER.add_phase_time('json_serialisation', time.perf_counter() - write_start_time)
+    return writer.num_records
+
+# Incremental rebuild: a sidecar manifest next to the output file stores the hash of the segments of each date
+import hashlib
+import contextlib
+
+# version of phases 3 to 5, to increase whenever a change to them changes the records of the same segments
+RENDERER_VERSION = 1
+
+def get_lectionary_manifest_filepath(input_output_filepath):
+    """Gets the path of the sidecar manifest of an output file"""
+    return input_output_filepath + '.manifest.json'
+
+def get_segment_list_hash(input_segment_list):
+    """Gets the SHA-256 hex digest of the content strings of the segments of a date"""
+    segment_list_hash = hashlib.sha256()
+    for segment_str, _ in input_segment_list:
+        segment_list_hash.update(segment_str.encode('utf-8'))
+        segment_list_hash.update(b'\0')
+    return segment_list_hash.hexdigest()
+
+def get_error_correction_config_hash():
+    """Gets the SHA-256 hex digest of the error correction config"""
+    return hashlib.sha256(json.dumps(get_error_correction_config(), sort_keys=True).encode('utf-8')).hexdigest()
+
+class LectionaryManifest:
+    """Custom class for the sidecar manifest of an output file, with the renderer version, the versions of the resources, the output options, the hash of the segments of each date and the byte range of its record in the output file"""
+    def __init__(self, input_output_filepath, input_json_lines=False, input_structured=False):
+        self.filepath = get_lectionary_manifest_filepath(input_output_filepath)
+        self.output_filepath = input_output_filepath
+        # the records also depend on the book maps and patterns of the resource bundle and on the typo corrections
+        self.option_dict = {'renderer_version': RENDERER_VERSION, 'resource_bundle_version': RESOURCE_BUNDLE_VERSION, 'resource_source_checksum': get_resource_bundle()['source_checksum'], 'error_correction_config_hash': get_error_correction_config_hash(), 'json_lines': input_json_lines, 'structured': input_structured}
+        self.date_str_to_hash_dict = {}
+        self.date_str_to_record_range_dict = {}
+        self.output_size = None
+        self.previous_date_str_to_hash_dict = {}
+        self.previous_date_str_to_record_range_dict = {}
+
+    def read_previous(self):
+        """Reads the hash of the segments and the byte range of the record of each date stored by the previous run, leaving them empty if there is none, if it used another renderer version, other resources or other output options, or if the output file changed since"""
+        try:
+            with open(self.filepath) as infile:
+                manifest_dict = json.load(infile)
+            output_size = os.path.getsize(self.output_filepath)
+        except (OSError, ValueError):
+            return
+        if {option_name: manifest_dict.get(option_name) for option_name in self.option_dict.keys()} != self.option_dict or manifest_dict.get('output_size') != output_size:
+            return
+        self.previous_date_str_to_hash_dict = manifest_dict.get('dates', {})
+        self.previous_date_str_to_record_range_dict = manifest_dict.get('records', {})
+
+    def read_previous_record(self, input_infile, input_date_str):
+        """Reads the record of a date from the previous output file opened in binary mode, by its byte range, returning None if it is not there"""
+        if input_date_str not in self.previous_date_str_to_record_range_dict:
+            return None
+        offset, length = self.previous_date_str_to_record_range_dict[input_date_str]
+        input_infile.seek(offset)
+        try:
+            record = json.loads(input_infile.read(length))
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) and record.get('date') == input_date_str else None
+
+    def save(self):
+        """Writes the manifest to a temporary file and renames it to its path"""
+        outfile, temp_filepath = open_temp_file(self.filepath)
+        with outfile:
+            json.dump(dict(self.option_dict, output_size=self.output_size, dates=self.date_str_to_hash_dict, records=self.date_str_to_record_range_dict), outfile, indent=1)
+        os.replace(temp_filepath, self.filepath)
+
+def write_lectionary_json_incremental(input_filepath, input_date_segment_list_iter, input_json_lines=False, input_structured=False):
+    """Writes each date with the record of its segments to a JSON or JSON Lines file, reusing the record of the previous output file for the dates whose segments have the same hash in its manifest, and returns the list of rebuilt dates, reused dates and removed date strings"""
+    manifest = LectionaryManifest(input_filepath, input_json_lines, input_structured)
+    manifest.read_previous()
+    previous_date_str_to_hash_dict = manifest.previous_date_str_to_hash_dict
+    rebuilt_date_list = []
+    reused_date_list = []
+    # the previous output file stays open while the new one is written next to it, each reused record is read from it by its byte range
+    with contextlib.ExitStack() as exit_stack:
+        previous_output_file = exit_stack.enter_context(open(input_filepath, 'rb')) if previous_date_str_to_hash_dict else None
+        with LectionaryJsonWriter(input_filepath, input_json_lines, input_structured) as writer:
+            for date, segment_list in input_date_segment_list_iter:
+                date_str = get_date_str(date)
+                segment_list_hash = get_segment_list_hash(segment_list)
+                manifest.date_str_to_hash_dict[date_str] = segment_list_hash
+                previous_record = manifest.read_previous_record(previous_output_file, date_str) if previous_date_str_to_hash_dict.get(date_str) == segment_list_hash else None
+                if previous_record is not None:
+                    writer.write_record(previous_record)
+                    reused_date_list.append(date)
+                else:
+                    writer.write(date, get_lectionary_item_list(date, segment_list))
+                    rebuilt_date_list.append(date)
+    manifest.date_str_to_record_range_dict = writer.date_str_to_record_range_dict
+    manifest.output_size = writer.num_bytes
+    manifest.save()
+    if PROFILER is not None:
+        PROFILER.count('rebuilt_dates', len(rebuilt_date_list))
+        PROFILER.count('reused_dates', len(reused_date_list))
+    removed_date_str_list = sorted(set(previous_date_str_to_hash_dict.keys()) - set(manifest.date_str_to_hash_dict.keys()))
+    return rebuilt_date_list, reused_date_list, removed_date_str_list
+
+def convert_lectionary_pdf(input_pdf_path, input_output_path, input_cache_path=None, input_json_lines=False, input_structured=False, input_extractor_name=DEFAULT_PDF_TEXT_EXTRACTOR_NAME):
+    """Custom function for a worker process to convert a lectionary PDF file to its own output file, returning the list of its dates with their lectionary records"""
+    date_record_list = []
+    with LectionaryJsonWriter(input_output_path, input_json_lines, input_structured) as writer:
+        for date, lectionary_item_list in iter_lectionary(input_pdf_path, cache_path=input_cache_path, extractor=input_extractor_name):
+            record = get_lectionary_record(date, lectionary_item_list, input_structured)
+            writer.write_record(record)
+            date_record_list.append((date, record))
+    return date_record_list
+
+def merge_date_record_lists(input_pdf_path_date_record_list_list):
+    """Merges the lists of dates with their lectionary records of several PDF files into one list sorted by date, keeping the record of the first PDF file for a date found in several of them, and returns it with the dictionary mapping each such overlapping date to the list of its PDF paths"""
+    date_to_pdf_path_list_dict = {}
+    date_to_record_dict = {}
+    for pdf_path, date_record_list in input_pdf_path_date_record_list_list:
+        for date, record in date_record_list:
+            push_to_dict(date_to_pdf_path_list_dict, date, pdf_path)
+            date_to_record_dict.setdefault(date, record)
+    overlapping_date_to_pdf_path_list_dict = {date: pdf_path_list for date, pdf_path_list in sorted(date_to_pdf_path_list_dict.items()) if len(pdf_path_list) > 1}
+    return [(date, date_to_record_dict[date]) for date in sorted(date_to_record_dict.keys())], overlapping_date_to_pdf_path_list_dict
+
+def convert_lectionary_pdf_batch(input_pdf_path_list, input_output_folderpath, input_merged_output_path, input_workers=None, input_cache_path=None, input_json_lines=False, input_structured=False, input_extractor_name=DEFAULT_PDF_TEXT_EXTRACTOR_NAME):
+    """Converts several lectionary PDF files in a pool of worker processes, each to its own output file in the output folder, and writes their merged records to one output file sorted by date, returning the dictionary of overlapping dates"""
+    import concurrent.futures
+    os.makedirs(input_output_folderpath, exist_ok=True)
+    extension = '.jsonl' if input_json_lines else '.json'
+    output_path_list = [os.path.join(input_output_folderpath, os.path.splitext(os.path.basename(pdf_path))[0] + extension) for pdf_path in input_pdf_path_list]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=input_workers) as executor:
+        future_list = [executor.submit(convert_lectionary_pdf, pdf_path, output_path, input_cache_path, input_json_lines, input_structured, input_extractor_name) for pdf_path, output_path in zip(input_pdf_path_list, output_path_list)]
+        pdf_path_date_record_list_list = [(pdf_path, future.result()) for pdf_path, future in zip(input_pdf_path_list, future_list)]
+    merged_date_record_list, overlapping_date_to_pdf_path_list_dict = merge_date_record_lists(pdf_path_date_record_list_list)
+    with LectionaryJsonWriter(input_merged_output_path, input_json_lines, input_structured) as writer:
+        for date, record in merged_date_record_list:
+            writer.write_record(record)
+    return overlapping_date_to_pdf_path_list_dict
+
+DEFAULT_PDF_SOURCE_FILENAME = 'YearA_2022.pdf' # 'YearC_21-22_ALL.pdf'
+DEFAULT_PAGE_TEXT_CACHE_FILEPATH = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'lectionary_pdf_to_json', 'page_text.sqlite3')
+
+def add_output_arguments(input_parser):
+    """Adds the command line arguments about the text extraction, the page text cache and the output format to the input parser"""
+    input_parser.add_argument('--extractor', choices=list(PDF_TEXT_EXTRACTOR_NAME_TO_CLASS_DICT.keys()), default=DEFAULT_PDF_TEXT_EXTRACTOR_NAME, help='library or program extracting the text from the PDF pages, compared by lectionary_benchmark.py extractors')
+    input_parser.add_argument('--cache', default=DEFAULT_PAGE_TEXT_CACHE_FILEPATH, help='path of the SQLite file caching the text extracted from PDF pages')
+    input_parser.add_argument('--no-cache', dest='cache', action='store_const', const=None, help='always extract the text from the PDF pages')
+    input_parser.add_argument('--format', choices=['json', 'jsonl'], help='format of the output file, JSON Lines if the output path ends with .jsonl and JSON otherwise')
+    input_parser.add_argument('--precompress', action='store_true', help='also write the gzip version (.gz) of the output file and, if the brotli package is installed, its Brotli version (.br)')
+    input_parser.add_argument('--structured', action='store_true', help='also write the feast name, readings, prayers, acclamations and colors of each lectionary item under "items"')
+
+def write_precompressed_output_files(input_filepath):
+    """Writes the precompressed versions of an output file, noting on stderr if the Brotli version is skipped"""
+    if input_filepath + '.br' not in write_precompressed_files(input_filepath):
+        print('The brotli package is not installed, only wrote {}.gz'.format(input_filepath), file=sys.stderr)
+
+def main_batch(input_arg_list=None):
+    """Command line entry point to convert several lectionary PDF files in parallel, to one JSON file each and one merged JSON file"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='lectionary_pdf_to_json.py batch', description='Convert several PDFs of the lectionary in parallel, inferring the start date of each, to one JSON file each and one JSON file merging them by date.')
+    parser.add_argument('pdf_path_list', nargs='+', metavar='pdf_path', help='paths of the lectionary PDF files, the first one wins for a date found in several of them')
+    parser.add_argument('--output-folder', default='.', help='folder of the output JSON file of each PDF file')
+    parser.add_argument('-o', '--output', default='lectionary.json', help='path of the merged output JSON file')
+    parser.add_argument('-j', '--workers', type=int, help='number of processes converting the PDF files, by default the number of CPUs')
+    add_output_arguments(parser)
+    args = parser.parse_args(input_arg_list)
+    if args.extractor not in get_available_pdf_text_extractor_name_list():
+        parser.error('the {} extractor is not installed'.format(args.extractor))
+    json_lines = args.format == 'jsonl' if args.format else args.output.endswith('.jsonl')
+    overlapping_date_to_pdf_path_list_dict = convert_lectionary_pdf_batch(args.pdf_path_list, args.output_folder, args.output, args.workers, args.cache, json_lines, args.structured, args.extractor)
+    if args.precompress:
+        write_precompressed_output_files(args.output)
+    for date, pdf_path_list in overlapping_date_to_pdf_path_list_dict.items():
+        print('Overlapping date {} in {}, kept the first'.format(date, ', '.join(pdf_path_list)), file=sys.stderr)
+
+def main(input_arg_list=None):
+    """Command line entry point to convert a lectionary PDF file to a JSON file"""
+    import argparse
+    if input_arg_list is None:
+        input_arg_list = sys.argv[1:]
+    if input_arg_list[:1] == ['batch']:
+        return main_batch(input_arg_list[1:])
+    parser = argparse.ArgumentParser(description='Convert the PDF of the lectionary to a JSON file for later use in HTML. Use "batch" as the first argument to convert several PDF files.')
+    parser.add_argument('pdf_path', nargs='?', default=os.path.join(SCRIPT_FOLDERPATH, DEFAULT_PDF_SOURCE_FILENAME), help='path of the lectionary PDF file')
+    parser.add_argument('--start-date', type=datetime.date.fromisoformat, help='date of the first date header in the PDF file, as YYYY-MM-DD, inferred from the first page by default')
+    parser.add_argument('-o', '--output', default='lectionary.json', help='path of the output JSON file')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='number of processes extracting the text of the PDF pages')
+    parser.add_argument('--render-workers', type=int, default=1, help='number of processes parsing and rendering the dates, in chunks of {} dates, only worth it for inputs of several years on as many CPUs; fewer dates than a chunk per process are rendered in this process'.format(RENDER_CHUNK_SIZE))
+    add_output_arguments(parser)
+    parser.add_argument('--shards', metavar='FOLDER', help='write the records to one JSON Lines file per month in this folder, with an index.json of the byte range of the record of each date, instead of the output file')
+    parser.add_argument('--incremental', action='store_true', help='only rebuild the dates whose segments changed since the previous run, as stored in a manifest next to the output file, and print the changed dates')
+    parser.add_argument('--profile', metavar='PATH', help='record the time of each phase and date, the slowest calls and the cache counters to this JSON file, and print a summary of the slowest dates')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N', help='number of slowest dates and calls to keep when profiling')
+    args = parser.parse_args(input_arg_list)
+    if args.extractor not in get_available_pdf_text_extractor_name_list():
+        parser.error('the {} extractor is not installed'.format(args.extractor))
+    if args.shards and args.incremental:
+        parser.error('--incremental does not apply to --shards')
+    if args.render_workers > 1 and args.incremental:
+        parser.error('--render-workers does not apply to --incremental')
+    if args.precompress and args.shards:
+        parser.error('--precompress does not apply to --shards')
+    json_lines = args.format == 'jsonl' if args.format else args.output.endswith('.jsonl')
+    if args.profile:
+        profiler = Profiler(args.profile_top)
+        profiler.install()
+    try:
+        if args.incremental:
+            date_segment_list_iter = iter_lectionary_segments(args.pdf_path, start_date=args.start_date, workers=args.workers, cache_path=args.cache, extractor=args.extractor)
+            rebuilt_date_list, reused_date_list, removed_date_str_list = write_lectionary_json_incremental(args.output, date_segment_list_iter, json_lines, args.structured)
+        elif args.render_workers > 1:
+            date_segment_list_iter = iter_lectionary_segments(args.pdf_path, start_date=args.start_date, workers=args.workers, cache_path=args.cache, extractor=args.extractor)
+            date_record_iter = iter_rendered_lectionary_records(date_segment_list_iter, args.structured, args.render_workers)
+            if args.shards:
+                writer = LectionaryShardWriter(args.shards, args.structured)
+            else:
+                writer = LectionaryJsonWriter(args.output, json_lines, args.structured)
+            write_lectionary_records(writer, date_record_iter)
+        elif args.shards:
+            date_lectionary_item_list_iter = iter_lectionary(args.pdf_path, start_date=args.start_date, workers=args.workers, cache_path=args.cache, extractor=args.extractor)
+            write_lectionary_shards(args.shards, date_lectionary_item_list_iter, args.structured)
+        else:
+            date_lectionary_item_list_iter = iter_lectionary(args.pdf_path, start_date=args.start_date, workers=args.workers, cache_path=args.cache, extractor=args.extractor)
+            write_lectionary_json(args.output, date_lectionary_item_list_iter, json_lines, args.structured)
+    finally:
+        if args.profile:
+            profiler.uninstall()
+    if args.precompress:
+        write_precompressed_output_files(args.output)
+    if args.profile:
+        with open(args.profile, 'w') as outfile:
+            json.dump(profiler.get_report(), outfile, indent=1)
+        print(profiler.get_summary(), file=sys.stderr)
+    if args.incremental:
+        # the changed dates on stdout, one per line, for the invalidation of downstream caches
+        for date_str in sorted([get_date_str(date) for date in rebuilt_date_list] + removed_date_str_list):
+            print(date_str)
+        print('Rebuilt {} date(s), reused {} and removed {}'.format(len(rebuilt_date_list), len(reused_date_list), len(removed_date_str_list)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import mmap
+import asyncio
+import functools
+
+import lectionary_pdf_to_json as lectionary
+
+DATE_PATH_RE_COMPILE = re.compile(r'/date/(\d{4}-\d{2}-\d{2})')
+
+HTTP_STATUS_TO_REASON_DICT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+class ShardStore:
+    """Custom class reading the record of a date from the memory-mapped shards written by LectionaryShardWriter, through an LRU cache"""
+    def __init__(self, input_folderpath, input_cache_size=512):
+        self.folderpath = input_folderpath
+        with open(os.path.join(input_folderpath, lectionary.SHARD_INDEX_FILENAME)) as infile:
+            self.date_str_to_shard_range_dict = json.load(infile)
+        self.shard_filename_to_mmap_dict = {}
+        self.get_record_bytes = functools.lru_cache(maxsize=input_cache_size)(self.read_record_bytes)
+
+    def get_shard_mmap(self, input_shard_filename):
+        """Gets the memory map of a shard, mapping it on first use"""
+        shard_mmap = self.shard_filename_to_mmap_dict.get(input_shard_filename)
+        if shard_mmap is None:
+            with open(os.path.join(self.folderpath, input_shard_filename), 'rb') as infile:
+                shard_mmap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            self.shard_filename_to_mmap_dict[input_shard_filename] = shard_mmap
+        return shard_mmap
+
+    def read_record_bytes(self, input_date_str):
+        """Reads the JSON bytes of the record of a date, None if the date is not in the index"""
+        shard_range = self.date_str_to_shard_range_dict.get(input_date_str)
+        if shard_range is None:
+            return None
+        shard_filename, offset, length = shard_range
+        return self.get_shard_mmap(shard_filename)[offset:offset + length]
+
+    def close(self):
+        """Unmaps the shards"""
+        for shard_mmap in self.shard_filename_to_mmap_dict.values():
+            shard_mmap.close()
+        self.shard_filename_to_mmap_dict = {}
+
+def get_response_bytes(input_status, input_body, input_keep_alive=True):
+    """Gets the bytes of an HTTP response with a JSON body"""
+    header_str = 'HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nAccess-Control-Allow-Origin: *\r\nConnection: {}\r\n\r\n'.format(input_status, HTTP_STATUS_TO_REASON_DICT[input_status], len(input_body), 'keep-alive' if input_keep_alive else 'close')
+    return header_str.encode('ascii') + input_body
+
+def get_error_body(input_status):
+    """Gets the JSON body of an error response"""
+    return json.dumps({'error': HTTP_STATUS_TO_REASON_DICT[input_status]}).encode('ascii')
+
+def get_date_response(input_shard_store, input_method, input_path):
+    """Gets the status and the body of the response to a request"""
+    if input_method != 'GET':
+        return 405, get_error_body(405)
+    date_path_re_match = DATE_PATH_RE_COMPILE.fullmatch(input_path.split('?', 1)[0])
+    if date_path_re_match is None:
+        return 404, get_error_body(404)
+    record_bytes = input_shard_store.get_record_bytes(date_path_re_match.group(1))
+    if record_bytes is None:
+        return 404, get_error_body(404)
+    return 200, record_bytes
+
+async def handle_connection(input_shard_store, input_reader, input_writer):
+    """Serves the requests of a connection until the client closes it or asks to"""
+    try:
+        while True:
+            request_line = await input_reader.readline()
+            if not request_line:
+                break
+            keep_alive = True
+            while True:
+                header_line = await input_reader.readline()
+                if header_line in (b'\r\n', b'\n', b''):
+                    break
+                if header_line.lower().startswith(b'connection:') and b'close' in header_line.lower():
+                    keep_alive = False
+            request_part_list = request_line.decode('latin-1').split()
+            if len(request_part_list) != 3:
+                input_writer.write(get_response_bytes(400, get_error_body(400), False))
+                break
+            method, path, version = request_part_list
+            if version == 'HTTP/1.0':
+                keep_alive = False
+            status, body = get_date_response(input_shard_store, method, path)
+            input_writer.write(get_response_bytes(status, body, keep_alive))
+            await input_writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        input_writer.close()
+
+async def serve(input_shard_store, input_host='127.0.0.1', input_port=8000):
+    """Serves /date/YYYY-MM-DD from the shard store until cancelled"""
+    server = await asyncio.start_server(functools.partial(handle_connection, input_shard_store), input_host, input_port)
+    async with server:
+        await server.serve_forever()
+
+def main(input_arg_list=None):
+    """Command line entry point of the local lookup server"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve the record of a date as JSON at /date/YYYY-MM-DD from the shards written by lectionary_pdf_to_json.py --shards.')
+    parser.add_argument('folderpath', help='folder of the shards and their index.json')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on')
+    parser.add_argument('--cache-size', type=int, default=512, help='number of records kept in the LRU cache')
+    args = parser.parse_args(input_arg_list)
+    shard_store = ShardStore(args.folderpath, args.cache_size)
+    try:
+        asyncio.run(serve(shard_store, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shard_store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import concurrent.futures
+
+import lectionary_pdf_to_json as lectionary
+
+DEFAULT_CONTROL_SOCKET_FILENAME = '.lectionary_watch.sock'
+
+class LectionaryWatcher:
+    """Custom class for a long running process converting the lectionary PDF files of a folder to one output file each, whenever one is added or modified, with its regex patterns, resource bundle and page text cache kept warm between the conversions"""
+    def __init__(self, input_folderpath, input_output_folderpath, input_json_lines=False, input_structured=False, input_extractor_name=lectionary.DEFAULT_PDF_TEXT_EXTRACTOR_NAME, input_cache_path=None, input_precompress=False, input_debounce_seconds=2.0, input_queue_size=16):
+        self.folderpath = input_folderpath
+        self.output_folderpath = input_output_folderpath
+        self.json_lines = input_json_lines
+        self.structured = input_structured
+        self.extractor_name = input_extractor_name
+        # without a cache file, the pages extracted by this process are still kept in memory
+        self.cache_path = input_cache_path or ':memory:'
+        self.precompress = input_precompress
+        self.debounce_seconds = input_debounce_seconds
+        self.queue = asyncio.Queue(maxsize=input_queue_size)
+        self.path_to_pending_signature_time_dict = {}
+        self.path_to_built_signature_dict = {}
+        self.queued_path_set = set()
+        self.current_path = None
+        self.result_list = []
+        # the files left pending while the queue is full, each counted once however many scans find the queue full
+        self.deferred_path_set = set()
+        self.error = None
+        self.start_time = time.time()
+        # a single thread converts the PDF files, so that the SQLite connection of the page text cache stays in the thread that opened it
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.page_text_cache = None
+        self.stop_event = asyncio.Event()
+
+    def warm_up(self):
+        """Reads the resource bundle, compiles the regex patterns and opens the page text cache, in the conversion thread"""
+        lectionary.get_resource_bundle()
+        lectionary.RE_PATTERN_REGISTRY.compile_all()
+        self.page_text_cache = lectionary.PageTextCache(input_filepath=self.cache_path)
+
+    def get_output_filepath(self, input_pdf_path):
+        """Gets the path of the output file of a PDF file"""
+        return os.path.join(self.output_folderpath, os.path.splitext(os.path.basename(input_pdf_path))[0] + ('.jsonl' if self.json_lines else '.json'))
+
+    def convert(self, input_pdf_path):
+        """Rebuilds the output file of a PDF file, only rendering the dates whose segments changed, and returns the dictionary of the result"""
+        start_time = time.perf_counter()
+        output_filepath = self.get_output_filepath(input_pdf_path)
+        date_segment_list_iter = lectionary.iter_lectionary_segments(input_pdf_path, extractor=self.extractor_name, page_text_cache=self.page_text_cache)
+        rebuilt_date_list, reused_date_list, removed_date_str_list = lectionary.write_lectionary_json_incremental(output_filepath, date_segment_list_iter, self.json_lines, self.structured)
+        if self.precompress:
+            lectionary.write_precompressed_files(output_filepath)
+        return {'pdf_path': input_pdf_path, 'output_path': output_filepath, 'rebuilt_dates': len(rebuilt_date_list), 'reused_dates': len(reused_date_list), 'removed_dates': len(removed_date_str_list), 'seconds': time.perf_counter() - start_time}
+
+    def get_pdf_path_to_signature_dict(self):
+        """Gets the dictionary mapping the path of each PDF file of the folder to its modification time and size"""
+        output_dict = {}
+        with os.scandir(self.folderpath) as dir_entry_iter:
+            for dir_entry in dir_entry_iter:
+                if dir_entry.name.lower().endswith('.pdf') and dir_entry.is_file():
+                    stat_result = dir_entry.stat()
+                    output_dict[dir_entry.path] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return output_dict
+
+    def scan(self):
+        """Queues the PDF files added or modified since their last conversion once they have not changed for the debounce time, leaving them pending while the queue is full"""
+        now = time.monotonic()
+        pdf_path_to_signature_dict = self.get_pdf_path_to_signature_dict()
+        # a removed file is converted again if it comes back, its output file is left as is
+        for pdf_path_dict in (self.path_to_pending_signature_time_dict, self.path_to_built_signature_dict):
+            for pdf_path in [pdf_path for pdf_path in pdf_path_dict.keys() if pdf_path not in pdf_path_to_signature_dict]:
+                del pdf_path_dict[pdf_path]
+        self.deferred_path_set.intersection_update(pdf_path_to_signature_dict.keys())
+        for pdf_path, signature in sorted(pdf_path_to_signature_dict.items()):
+            if self.path_to_built_signature_dict.get(pdf_path) == signature or pdf_path in self.queued_path_set:
+                continue
+            pending_signature, pending_time = self.path_to_pending_signature_time_dict.get(pdf_path, (None, None))
+            if pending_signature != signature:
+                # a file still being copied keeps changing, so wait until it has been stable for the debounce time
+                self.path_to_pending_signature_time_dict[pdf_path] = (signature, now)
+                continue
+            if now - pending_time < self.debounce_seconds:
+                continue
+            try:
+                self.queue.put_nowait((pdf_path, signature))
+            except asyncio.QueueFull:
+                self.deferred_path_set.add(pdf_path)
+                continue
+            self.deferred_path_set.discard(pdf_path)
+            self.queued_path_set.add(pdf_path)
+            del self.path_to_pending_signature_time_dict[pdf_path]
+
+    async def watch(self, input_interval_seconds=1.0):
+        """Scans the folder at the input interval until stopped"""
+        while not self.stop_event.is_set():
+            self.scan()
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), input_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def work(self):
+        """Converts the queued PDF files one at a time in the conversion thread, until stopped, stopping the watcher if it cannot warm up"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.warm_up)
+        except Exception as exception:
+            # no file could be converted, e.g. without the resource bundle or the page text cache
+            self.error = 'Could not warm up: {!r}'.format(exception)
+            print(self.error, file=sys.stderr)
+            self.stop_event.set()
+            return
+        while True:
+            pdf_path, signature = await self.queue.get()
+            self.current_path = pdf_path
+            try:
+                result = await loop.run_in_executor(self.executor, self.convert, pdf_path)
+                print('Converted {} to {}: rebuilt {} date(s), reused {} and removed {} in {:.2f} s'.format(pdf_path, result['output_path'], result['rebuilt_dates'], result['reused_dates'], result['removed_dates'], result['seconds']), file=sys.stderr)
+            except Exception as exception:
+                result = {'pdf_path': pdf_path, 'error': repr(exception)}
+                print('Could not convert {}: {!r}'.format(pdf_path, exception), file=sys.stderr)
+            # a file modified during its conversion has another signature, so it is converted again
+            self.path_to_built_signature_dict[pdf_path] = signature
+            result['time'] = time.time()
+            self.result_list = (self.result_list + [result])[-20:]
+            self.queued_path_set.discard(pdf_path)
+            self.current_path = None
+            self.queue.task_done()
+
+    def get_status_dict(self):
+        """Gets the dictionary of the status of the watcher"""
+        return {
+            'folder': self.folderpath,
+            'output_folder': self.output_folderpath,
+            'uptime_seconds': time.time() - self.start_time,
+            'converting': self.current_path,
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'pending': sorted(self.path_to_pending_signature_time_dict.keys()),
+            'deferred_while_queue_full': len(self.deferred_path_set),
+            'converted_files': len(self.path_to_built_signature_dict),
+            'recent_results': self.result_list,
+        }
+
+    async def handle_control_connection(self, input_reader, input_writer):
+        """Answers each command line of a control connection, 'status' with the status as JSON and 'stop' by stopping the watcher"""
+        try:
+            while True:
+                command_line = await input_reader.readline()
+                if not command_line:
+                    break
+                command = command_line.decode('utf-8').strip()
+                if command == 'status':
+                    response_dict = self.get_status_dict()
+                elif command == 'stop':
+                    response_dict = {'stopping': True}
+                    self.stop_event.set()
+                else:
+                    response_dict = {'error': 'Unknown command {!r}, expected status or stop'.format(command)}
+                input_writer.write(json.dumps(response_dict).encode('utf-8') + b'\n')
+                await input_writer.drain()
+                if self.stop_event.is_set():
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            input_writer.close()
+
+    async def run(self, input_control_socket_path, input_interval_seconds=1.0):
+        """Watches the folder, converts the queued PDF files and answers the control socket until stopped"""
+        os.makedirs(self.output_folderpath, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, self.stop_event.set)
+        if os.path.exists(input_control_socket_path):
+            os.remove(input_control_socket_path)
+        control_server = await asyncio.start_unix_server(self.handle_control_connection, input_control_socket_path)
+        task_list = [asyncio.ensure_future(self.watch(input_interval_seconds)), asyncio.ensure_future(self.work())]
+        try:
+            await self.stop_event.wait()
+        finally:
+            control_server.close()
+            await control_server.wait_closed()
+            os.remove(input_control_socket_path)
+            for task in task_list:
+                task.cancel()
+            await asyncio.gather(*task_list, return_exceptions=True)
+            # let a conversion in progress complete, then close the page text cache in its thread
+            if self.page_text_cache is not None:
+                await loop.run_in_executor(self.executor, self.page_text_cache.close)
+            self.executor.shutdown()
+
+def get_is_watch_mode_supported():
+    """Returns whether the platform has the Unix sockets and the signal handlers of asyncio the watch mode relies on, which Windows does not"""
+    return sys.platform != 'win32' and hasattr(asyncio, 'start_unix_server')
+
+def send_control_command(input_control_socket_path, input_command):
+    """Sends a command to the control socket of a running watcher and returns its JSON response as a dictionary"""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as control_socket:
+        control_socket.connect(input_control_socket_path)
+        control_socket.sendall(input_command.encode('utf-8') + b'\n')
+        with control_socket.makefile('rb') as infile:
+            return json.loads(infile.readline())
+
+def main(input_arg_list=None):
+    """Command line entry point of the watch mode"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Watch a folder for new or modified lectionary PDF files and convert each to its own JSON file, keeping the regex patterns, resource bundle and page text cache warm. Use --status or --stop to query or stop a running watcher.')
+    parser.add_argument('folderpath', help='folder of the lectionary PDF files')
+    parser.add_argument('--output-folder', default='.', help='folder of the output JSON file of each PDF file')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between two scans of the folder')
+    parser.add_argument('--debounce', type=float, default=2.0, help='seconds a PDF file must stay unchanged before it is converted')
+    parser.add_argument('--queue-size', type=int, default=16, help='number of PDF files waiting for conversion, the others stay pending until there is room')
+    parser.add_argument('--control-socket', help='path of the Unix socket answering "status" and "stop", {} in the output folder by default'.format(DEFAULT_CONTROL_SOCKET_FILENAME))
+    parser.add_argument('--status', action='store_true', help='print the status of the running watcher and exit')
+    parser.add_argument('--stop', action='store_true', help='stop the running watcher and exit')
+    lectionary.add_output_arguments(parser)
+    args = parser.parse_args(input_arg_list)
+    if not get_is_watch_mode_supported():
+        parser.error('the watch mode only runs on Unix, as it needs a Unix control socket and asyncio signal handlers; on {} run lectionary_pdf_to_json.py --incremental instead, e.g. from a scheduled task'.format(sys.platform))
+    control_socket_path = args.control_socket or os.path.join(args.output_folder, DEFAULT_CONTROL_SOCKET_FILENAME)
+    if args.status or args.stop:
+        print(json.dumps(send_control_command(control_socket_path, 'stop' if args.stop else 'status'), indent=1))
+        return
+    if args.extractor not in lectionary.get_available_pdf_text_extractor_name_list():
+        parser.error('the {} extractor is not installed'.format(args.extractor))
+    json_lines = args.format == 'jsonl'
+    async def run():
+        watcher = LectionaryWatcher(args.folderpath, args.output_folder, json_lines, args.structured, args.extractor, args.cache, args.precompress, args.debounce, args.queue_size)
+        await watcher.run(control_socket_path, args.interval)
+        return watcher.error
+    if asyncio.run(run()) is not None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import collections
+import os
+import re
+import shutil
+
+import pytest
+
+import lectionary_pdf_to_json as lectionary
+from lectionary_benchmark import BUNDLED_PDF_FILENAME_TO_START_DATE_DICT, get_extracted_page_text_list, get_page_text_list_output_dict
+
+@pytest.fixture(scope='module', params=sorted(BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.keys()))
+def pdf_filename(request):
+    return request.param
+
+@pytest.fixture(scope='module')
+def reference_page_text_list(pdf_filename):
+    """Gets the list of the text in the pages of a bundled PDF file extracted with the default extractor"""
+    return get_extracted_page_text_list(os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename), lectionary.DEFAULT_PDF_TEXT_EXTRACTOR_NAME)
+
+def get_date_str_list(input_page_text_list, input_pdf_filename):
+    """Gets the list of the dates of the lectionary parsed from the text of the pages of a bundled PDF file"""
+    output_dict = get_page_text_list_output_dict(input_page_text_list, BUNDLED_PDF_FILENAME_TO_START_DATE_DICT[input_pdf_filename], os.path.join(lectionary.SCRIPT_FOLDERPATH, input_pdf_filename))
+    return [record['date'] for record in output_dict['main']]
+
+@pytest.mark.parametrize('extractor_name', ['pypdf', 'pdfminer', 'pdftotext'])
+def test_extractor_parity(pdf_filename, reference_page_text_list, extractor_name):
+    if extractor_name not in lectionary.get_available_pdf_text_extractor_name_list():
+        pytest.skip('the {} extractor is not installed'.format(extractor_name))
+    page_text_list = get_extracted_page_text_list(os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename), extractor_name)
+    assert len(page_text_list) == len(reference_page_text_list)
+    # the extractors differ in the whitespace and, with a layout analysis, in the order of the text blocks, but not in the characters of a page
+    for page_text, reference_page_text in zip(page_text_list, reference_page_text_list):
+        assert collections.Counter(re.sub('\\s+', '', page_text)) == collections.Counter(re.sub('\\s+', '', reference_page_text))
+    assert get_date_str_list(page_text_list, pdf_filename) == get_date_str_list(reference_page_text_list, pdf_filename)
+
+def test_pdftotext_needs_pdfinfo(monkeypatch):
+    which = shutil.which
+    monkeypatch.setattr(shutil, 'which', lambda program_name: None if program_name == 'pdfinfo' else which(program_name) or '/usr/bin/' + program_name)
+    assert 'pdftotext' not in lectionary.get_available_pdf_text_extractor_name_list()
+    with pytest.raises(ImportError):
+        lectionary.PdftotextTextExtractor(os.path.join(lectionary.SCRIPT_FOLDERPATH, lectionary.DEFAULT_PDF_SOURCE_FILENAME))
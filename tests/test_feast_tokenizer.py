@@ -0,0 +1,33 @@
+import datetime
+import time
+
+import pytest
+
+import lectionary_pdf_to_json as lectionary
+from lectionary_benchmark import get_adversarial_feast_segment
+
+def test_feast_section_span_list():
+    segment = 'Christmas Day Readings Isaiah 9:2-7 Prayer of the Day Almighty God Gospel Acclamation Alleluia Color White'
+    section_list = [segment[start:end] for start, end in lectionary.get_feast_section_span_list(segment)]
+    assert section_list == ['Christmas Day', 'Isaiah 9:2-7', 'Almighty God', 'Alleluia', 'White']
+
+def test_adversarial_feast_is_rejected_in_linear_time():
+    segment = get_adversarial_feast_segment(2000)
+    start_time = time.perf_counter()
+    with pytest.raises(lectionary.FeastParseError) as exception_info:
+        lectionary.get_feast_section_span_list(segment)
+    # the feast regex pattern would not complete on 20 repeats already
+    assert time.perf_counter() - start_time < 1.0
+    diagnostic_dict = exception_info.value.diagnostic_dict
+    assert diagnostic_dict['missing_headers'] == ['Color']
+    assert diagnostic_dict['out_of_order_headers'] == []
+    assert diagnostic_dict['text'] == segment[:80]
+    assert len(diagnostic_dict['header_positions']['Readings']) == 2000
+
+def test_unparsable_feast_is_skipped_and_logged(caplog):
+    segment_list = [(get_adversarial_feast_segment(5), True), ('Hebrews 1:1-4', False)]
+    lectionary_item_list = lectionary.get_lectionary_item_list(datetime.date(2022, 12, 25), segment_list)
+    assert [lectionary_item.is_feast for lectionary_item in lectionary_item_list] == [False]
+    assert len(caplog.records) == 1
+    assert '2022/12/25' in caplog.records[0].getMessage()
+    assert "'missing_headers': ['Color']" in caplog.records[0].getMessage()
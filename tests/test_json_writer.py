@@ -0,0 +1,25 @@
+import json
+import os
+
+import pytest
+
+import lectionary_pdf_to_json as lectionary
+
+RECORD_LIST = [
+    {'date': '2022/11/30', 'html': ['<h2>Daily Lectionary</h2>\n<p><b>Isaiah 9:2 —7</b></p>']},
+    {'date': '2022/12/01', 'html': []},
+]
+
+@pytest.mark.parametrize('json_lines', [False, True])
+def test_record_ranges_are_byte_ranges_of_the_file(tmp_path, json_lines):
+    output_filepath = str(tmp_path / 'lectionary.json')
+    with lectionary.LectionaryJsonWriter(output_filepath, json_lines) as writer:
+        for record in RECORD_LIST:
+            writer.write_record(record)
+    with open(output_filepath, 'rb') as infile:
+        content = infile.read()
+    # the newlines between the JSON Lines are written as is, whatever the platform
+    assert writer.num_bytes == len(content) == os.path.getsize(output_filepath)
+    for record in RECORD_LIST:
+        offset, length = writer.date_str_to_record_range_dict[record['date']]
+        assert json.loads(content[offset:offset + length]) == record
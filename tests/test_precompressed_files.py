@@ -0,0 +1,19 @@
+import gzip
+
+import lectionary_pdf_to_json as lectionary
+
+def test_precompressed_file_decompresses_to_the_output(tmp_path):
+    json_filepath = str(tmp_path / 'lectionary.json')
+    with open(json_filepath, 'w') as outfile:
+        outfile.write('{"main": [{"date": "2022/11/30", "html": ["<h2>Daily Lectionary</h2>"]}]}')
+    compressed_filepath_list = lectionary.write_precompressed_files(json_filepath)
+    assert compressed_filepath_list[0] == json_filepath + '.gz'
+    with open(json_filepath, 'rb') as infile:
+        content = infile.read()
+    with open(json_filepath + '.gz', 'rb') as infile:
+        compressed_content = infile.read()
+    assert gzip.decompress(compressed_content) == content
+    # the same content gives the same file, whenever it is written
+    lectionary.write_precompressed_files(json_filepath)
+    with open(json_filepath + '.gz', 'rb') as infile:
+        assert infile.read() == compressed_content
@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+import lectionary_pdf_to_json as lectionary
+from lectionary_benchmark import BUNDLED_PDF_FILENAME_TO_START_DATE_DICT
+
+MEMOISED_FUNCTION_NAME_LIST = ['get_chapter_verse_str_clean_url', 'get_reading_ref', 'get_reading_link_html']
+
+# readings of YearA_2022.pdf as rendered before the memoisation, including the '/' after the NIV version
+BASELINE_DATE_STR_READING_HTML_LIST = [
+    # a psalm, linked to the plural book name on the ESV website
+    ('2022/12/14', '<p><b>Psalm 42</b></p> <p>Text: <a href="https://www.biblegateway.com/passage/?search=Psalm+42&version=NIV/">New International Version (NIV)</a> . <a href="https://www.esv.org/verses/Psalms+42/">English Standard Version (ESV)</a></p>'),
+    # a gospel of several verse ranges
+    ('2022/12/14', '<p><b>Matthew 8:14 -17, 28 -34</b></p> <p>Text: <a href="https://www.biblegateway.com/passage/?search=Matthew+8:14-17,28-34&version=NIV/">New International Version (NIV)</a> . <a href="https://www.esv.org/verses/Matthew+8:14-17,28-34/">English Standard Version (ESV)</a></p>'),
+    # a reading whose book name is corrected from 'Febrews' by error_correction_config.json
+    ('2023/01/05', '<p><b>Hebrews 11:32 \u201412:2</b></p> <p>Text: <a href="https://www.biblegateway.com/passage/?search=Hebrews+11:32-12:2&version=NIV/">New International Version (NIV)</a> . <a href="https://www.esv.org/verses/Hebrews+11:32-12:2/">English Standard Version (ESV)</a></p>'),
+]
+
+@pytest.fixture(scope='module', params=sorted(BUNDLED_PDF_FILENAME_TO_START_DATE_DICT.keys()))
+def date_segment_list_list(request):
+    """Gets the list of the dates of a bundled PDF file with their segments, extracted without the page text cache"""
+    pdf_filepath = os.path.join(lectionary.SCRIPT_FOLDERPATH, request.param)
+    return list(lectionary.iter_lectionary_segments(pdf_filepath, BUNDLED_PDF_FILENAME_TO_START_DATE_DICT[request.param]))
+
+def get_rendered_bytes(input_date_segment_list_list, input_structured):
+    """Gets the JSON Lines of the records of the dates rendered from their segments"""
+    return ''.join(json.dumps(lectionary.get_lectionary_record(date, lectionary.get_lectionary_item_list(date, segment_list), input_structured)) + '\n' for date, segment_list in input_date_segment_list_list).encode('utf-8')
+
+@pytest.mark.parametrize('structured', [False, True])
+def test_rendering_is_the_same_without_the_caches(date_segment_list_list, structured, monkeypatch):
+    for function_name in MEMOISED_FUNCTION_NAME_LIST:
+        getattr(lectionary, function_name).cache_clear()
+    cached_bytes = get_rendered_bytes(date_segment_list_list, structured)
+    # the readings come back across the year, so the caches were hit
+    assert lectionary.get_reading_ref.cache_info().hits > 0
+    assert lectionary.get_reading_link_html.cache_info().hits > 0
+    for function_name in MEMOISED_FUNCTION_NAME_LIST:
+        monkeypatch.setattr(lectionary, function_name, getattr(lectionary, function_name).__wrapped__)
+    assert get_rendered_bytes(date_segment_list_list, structured) == cached_bytes
+
+@pytest.fixture(scope='module')
+def year_a_date_segment_list_list():
+    """Gets the list of the dates of YearA_2022.pdf with their segments, extracted without the page text cache"""
+    pdf_filename = 'YearA_2022.pdf'
+    return list(lectionary.iter_lectionary_segments(os.path.join(lectionary.SCRIPT_FOLDERPATH, pdf_filename), BUNDLED_PDF_FILENAME_TO_START_DATE_DICT[pdf_filename]))
+
+@pytest.mark.parametrize('memoised', [True, False])
+def test_reading_links_are_the_baseline_ones(year_a_date_segment_list_list, memoised, monkeypatch):
+    if not memoised:
+        for function_name in MEMOISED_FUNCTION_NAME_LIST:
+            monkeypatch.setattr(lectionary, function_name, getattr(lectionary, function_name).__wrapped__)
+    date_str_to_html_dict = {}
+    for date, segment_list in year_a_date_segment_list_list:
+        date_str_to_html_dict[lectionary.get_date_str(date)] = ''.join(lectionary.get_lectionary_record(date, lectionary.get_lectionary_item_list(date, segment_list))['html'])
+    for date_str, reading_html in BASELINE_DATE_STR_READING_HTML_LIST:
+        assert reading_html in date_str_to_html_dict[date_str]